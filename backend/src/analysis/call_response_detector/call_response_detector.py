@@ -36,7 +36,7 @@ class CallResponseConfig:
             self.preferred_rhythmic_grid = [0.5, 1.0, 2.0, 4.0]
 
 
-@dataclass
+@dataclass(slots=True)
 class CallResponsePair:
     """Represents a call-response relationship between two motifs."""
     id: str
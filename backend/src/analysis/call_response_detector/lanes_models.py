@@ -1,7 +1,6 @@
 """Pydantic models for call/response lane visualization."""
 from pydantic import BaseModel
-from typing import List, Optional
-from typing_extensions import Literal
+from typing import List, Literal, Optional
 
 StemCategory = Literal["drums", "bass", "instruments", "vocals"]
 
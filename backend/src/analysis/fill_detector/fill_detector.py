@@ -23,7 +23,7 @@ class FillConfig:
     window_size: int = 2048  # Window size for transient density computation
 
 
-@dataclass
+@dataclass(slots=True)
 class Fill:
     """Represents a fill (transient-rich region near a boundary)."""
     id: str
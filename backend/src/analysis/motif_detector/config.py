@@ -1,10 +1,5 @@
 """Configuration for motif detection sensitivity per stem."""
-try:
-    from typing import TypedDict, Literal, Mapping
-except ImportError:
-    # Python < 3.8 compatibility
-    from typing_extensions import TypedDict, Literal
-    from typing import Mapping
+from typing import TypedDict, Literal, Mapping
 
 StemCategory = Literal["drums", "bass", "vocals", "instruments"]
 
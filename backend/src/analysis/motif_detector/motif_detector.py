@@ -9,17 +9,11 @@ TODO: AUDIT FINDINGS (see detect_motifs function for detailed logging):
 - The detector is fully wired for per-stem analysis
 """
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, List, Literal, Optional, Tuple
 import time
 from os import getenv
 from collections import Counter
 
-try:
-    from typing import Literal
-except ImportError:
-    # Python < 3.8 compatibility
-    from typing_extensions import Literal
-
 import numpy as np
 import librosa
 from sklearn.cluster import DBSCAN
@@ -46,7 +40,7 @@ MIN_SEGMENT_ENERGY_THRESHOLD = 0.01  # Minimum RMS energy to include a segment
 MFCC_N_MELS = 13  # Number of MFCC coefficients to extract
 
 
-@dataclass
+@dataclass(slots=True)
 class MotifInstance:
     """Represents a single instance of a motif in a stem."""
     id: str
@@ -64,7 +58,7 @@ class MotifInstance:
         return self.end_time - self.start_time
 
 
-@dataclass
+@dataclass(slots=True)
 class MotifGroup:
     """Represents a group of similar motif instances."""
     id: str
@@ -82,6 +76,81 @@ class MotifGroup:
         return [m for m in self.members if m.is_variation]
 
 
+class RawMotifInstances:
+    """
+    Struct-of-arrays snapshot of motif instances before clustering.
+    
+    Scalar fields live in one numpy structured array and feature vectors in a
+    single 2D array, so storing the unclustered instances for later
+    re-clustering costs a few array copies instead of one MotifInstance per motif.
+    The feature matrix is read-only, so the instances built from it share its
+    rows instead of copying them; region alignments are stored as interned
+    tuples, one per distinct alignment. Iterating yields fresh, unclustered
+    MotifInstance objects.
+    """
+    
+    def __init__(self, scalars: np.ndarray, features: np.ndarray, region_ids: List[Tuple[str, ...]]):
+        features.setflags(write=False)
+        self.scalars = scalars  # Structured array: id, stem_role, start_time, end_time
+        self.features = features  # Shape (n_instances, n_features), read-only
+        self.region_ids = region_ids
+    
+    @classmethod
+    def from_instances(cls, instances: List[MotifInstance]) -> "RawMotifInstances":
+        """Snapshot motif instances, dropping any clustering state."""
+        id_len = max((len(inst.id) for inst in instances), default=1)
+        role_len = max((len(inst.stem_role) for inst in instances), default=1)
+        scalars = np.array(
+            [(inst.id, inst.stem_role, inst.start_time, inst.end_time) for inst in instances],
+            dtype=[
+                ("id", f"U{id_len}"),
+                ("stem_role", f"U{role_len}"),
+                ("start_time", "f8"),
+                ("end_time", "f8"),
+            ]
+        )
+        if instances:
+            features = np.stack([inst.features for inst in instances])
+        else:
+            features = np.empty((0, 0))
+        # Most motifs fall in the same few regions, so identical alignments share one tuple
+        interned: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        region_ids = []
+        for inst in instances:
+            ids = tuple(inst.region_ids)
+            region_ids.append(interned.setdefault(ids, ids))
+        return cls(scalars, features, region_ids)
+    
+    def __len__(self) -> int:
+        return len(self.scalars)
+    
+    def __iter__(self):
+        return iter(self.to_instances())
+    
+    def to_instances(self, include_region_ids: bool = True) -> List[MotifInstance]:
+        """
+        Build fresh, unclustered MotifInstance objects.
+        
+        Args:
+            include_region_ids: Copy the stored region alignment (False leaves it empty)
+        
+        Returns:
+            List of MotifInstance with group_id=None and is_variation=False, whose
+            features are read-only views into the snapshot's feature matrix
+        """
+        return [
+            MotifInstance(
+                id=inst_id,
+                stem_role=stem_role,
+                start_time=start_time,
+                end_time=end_time,
+                features=self.features[i],
+                region_ids=list(self.region_ids[i]) if include_region_ids else []
+            )
+            for i, (inst_id, stem_role, start_time, end_time) in enumerate(self.scalars.tolist())
+        ]
+
+
 def bars_to_seconds(bars: float, bpm: float) -> float:
     """
     Convert bars to seconds.
@@ -212,7 +281,8 @@ def _extract_features(
 def _cluster_motifs(
     instances: List[MotifInstance],
     sensitivity: float = 0.5,
-    stem_role: Optional[str] = None
+    stem_role: Optional[str] = None,
+    feature_matrix: Optional[np.ndarray] = None
 ) -> Tuple[List[MotifInstance], List[MotifGroup]]:
     """
     Cluster motif instances into groups using DBSCAN.
@@ -223,6 +293,8 @@ def _cluster_motifs(
                     HIGHER sensitivity = more tolerant grouping (looser clustering, fewer groups)
                     LOWER sensitivity = stricter grouping (tighter clustering, more groups)
         stem_role: Optional stem role to prefix group IDs for uniqueness
+        feature_matrix: Optional pre-stacked features, one row per instance
+                        (e.g. RawMotifInstances.features); stacked from instances if omitted
     
     Returns:
         Tuple of (updated instances with group_id, list of MotifGroups)
@@ -231,7 +303,8 @@ def _cluster_motifs(
         return instances, []
     
     # Extract feature vectors
-    feature_matrix = np.array([inst.features for inst in instances])
+    if feature_matrix is None:
+        feature_matrix = np.array([inst.features for inst in instances])
     
     # Normalize features
     scaler = StandardScaler()
@@ -274,8 +347,7 @@ def _cluster_motifs(
         # Define percentile window for eps range
         # q_low = stricter end (15th percentile)
         # q_high = looser end (45th percentile)
-        q_low = np.percentile(distances, 15.0)
-        q_high = np.percentile(distances, 45.0)
+        q_low, q_high = np.percentile(distances, [15.0, 45.0])
         
         # Safety: if q_high <= q_low due to weird distribution, nudge
         if q_high <= q_low:
@@ -304,35 +376,34 @@ def _cluster_motifs(
     
     # Create groups with stem_role prefix for uniqueness
     prefix = f"{stem_role}_" if stem_role else ""
-    groups = {}
+    groups = {}  # group_id -> indices into instances / feature_matrix
     for idx, (instance, label) in enumerate(zip(instances, labels)):
         if label == -1:
             # Noise point (doesn't belong to any cluster)
             # Assign it its own group
             group_id = f"{prefix}motif_group_{len(groups)}"
             instance.group_id = group_id
-            groups[group_id] = [instance]
+            groups[group_id] = [idx]
         else:
             group_id = f"{prefix}motif_group_{label}"
             instance.group_id = group_id
             if group_id not in groups:
                 groups[group_id] = []
-            groups[group_id].append(instance)
+            groups[group_id].append(idx)
     
     # Create MotifGroup objects and mark variations
     motif_groups = []
-    for group_id, members in groups.items():
-        if len(members) == 0:
+    for group_id, member_indices in groups.items():
+        if len(member_indices) == 0:
             continue
+        members = [instances[i] for i in member_indices]
         
-        # Compute centroid of the group
-        group_features = np.array([m.features for m in members])
+        # Compute centroid of the group from the already stacked feature matrix
+        group_features = feature_matrix[member_indices]
         centroid = np.mean(group_features, axis=0)
         
         # Mark exemplar (closest to centroid) and variations
-        distances_to_centroid = [
-            np.linalg.norm(m.features - centroid) for m in members
-        ]
+        distances_to_centroid = np.linalg.norm(group_features - centroid, axis=1)
         exemplar_idx = np.argmin(distances_to_centroid)
         
         # Mark all as variations except the exemplar
@@ -360,14 +431,21 @@ def _align_motifs_with_regions(
         instances: List of motif instances
         regions: List of detected regions
     """
-    for instance in instances:
-        instance.region_ids = []
-        for region in regions:
-            # Check if motif overlaps with region
-            # Motif overlaps if it starts before region ends and ends after region starts
-            if (instance.start_time < region.end and 
-                instance.end_time > region.start):
-                instance.region_ids.append(region.id)
+    if not instances:
+        return
+    
+    region_ids = [region.id for region in regions]
+    region_starts = np.array([region.start for region in regions], dtype=float)
+    region_ends = np.array([region.end for region in regions], dtype=float)
+    motif_starts = np.array([instance.start_time for instance in instances], dtype=float)
+    motif_ends = np.array([instance.end_time for instance in instances], dtype=float)
+    
+    # Motif overlaps a region if it starts before the region ends and ends after it starts
+    # (instances x regions boolean matrix, computed in one pass)
+    overlaps = (motif_starts[:, None] < region_ends[None, :]) & (motif_ends[:, None] > region_starts[None, :])
+    
+    for instance, row in zip(instances, overlaps):
+        instance.region_ids = [region_ids[j] for j in np.flatnonzero(row)]
 
 
 def _detect_motifs_impl(
@@ -441,13 +519,20 @@ def _detect_motifs_impl(
             motifs_by_stem[stem_role] = 0
             continue
             
-        logger.info(f"[Motifs] Processing {stem_role} stem...")
-        
         audio = audio_file.samples
         sr = audio_file.sr
         
-        # Convert to mono
-        audio_mono = _ensure_mono(audio)
+        # Skip silent stems outright: a window's RMS never exceeds the stem's peak amplitude,
+        # so no segment of a stem peaking below the energy threshold can yield a motif
+        if audio.size == 0 or max(audio.max(), -audio.min()) < MIN_SEGMENT_ENERGY_THRESHOLD:
+            logger.info(f"[Motifs] Skipping {stem_role} stem (silent: peak below segment energy threshold)")
+            motifs_by_stem[stem_role] = 0
+            continue
+        
+        logger.info(f"[Motifs] Processing {stem_role} stem...")
+        
+        # Convert to mono (shared with the other analyzers)
+        audio_mono = audio_file.mono
         
         # Segment the stem
         t_seg_start = time.time()
@@ -411,16 +411,10 @@ def detect_regions(bundle: ReferenceBundle) -> List[Region]:
     
     # Get full mix audio
     full_mix = bundle.full_mix
-    audio = full_mix.samples
+    audio_mono = full_mix.mono
     sr = full_mix.sr
     duration = full_mix.duration
     
-    # Ensure mono for processing
-    if audio.ndim > 1:
-        audio_mono = np.mean(audio, axis=0) if audio.ndim == 2 else audio[0]
-    else:
-        audio_mono = audio
-    
     logger.info(f"Processing audio: {duration:.2f}s, {sr} Hz, shape: {audio_mono.shape}")
     
     # Step 1: Compute novelty curve
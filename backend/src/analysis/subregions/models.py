@@ -1,12 +1,6 @@
 """Models for subregion pattern analysis."""
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
-
-try:
-    from typing import Literal
-except ImportError:
-    # Python < 3.8 compatibility
-    from typing_extensions import Literal
+from typing import Optional, Dict, Any, List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -15,7 +9,7 @@ from pydantic import BaseModel, Field
 StemCategory = Literal["drums", "bass", "vocals", "instruments"]
 
 
-@dataclass
+@dataclass(slots=True)
 class SubRegionPattern:
     """
     Represents a subregion pattern within a region for a specific stem category.
@@ -49,7 +43,7 @@ class SubRegionPattern:
             raise ValueError("region_id cannot be empty")
 
 
-@dataclass
+@dataclass(slots=True)
 class RegionSubRegions:
     """
     Container for all subregion patterns within a single region.
@@ -11,7 +11,7 @@ from analysis.subregions.models import (
     RegionSubRegions
 )
 from analysis.motif_detector.motif_detector import MotifInstance, MotifGroup, bars_to_seconds
-from analysis.region_detector.features import compute_rms_envelope, _ensure_mono
+from analysis.region_detector.features import compute_rms_envelope
 from config import (
     DEFAULT_SUBREGION_BARS_PER_CHUNK,
     DEFAULT_SUBREGION_SILENCE_INTENSITY_THRESHOLD
@@ -54,8 +54,7 @@ class DensityCurves:
         }
         
         for stem_category, audio_file in stem_map.items():
-            audio = audio_file.samples
-            audio_mono = _ensure_mono(audio)
+            audio_mono = audio_file.mono
             
             # Compute RMS envelope
             rms = compute_rms_envelope(audio_mono, frame_length=frame_length, hop_length=hop_length)
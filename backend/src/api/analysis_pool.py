@@ -0,0 +1,56 @@
+"""Executor for the CPU-bound analysis stages run by the API routes."""
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from config import ANALYSIS_WORKERS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def get_analysis_pool() -> Optional[ProcessPoolExecutor]:
+    """Get (creating on first use) the analysis process pool, or None if it is disabled."""
+    global _POOL
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    if _POOL is None:
+        logger.info(f"Starting analysis process pool with {ANALYSIS_WORKERS} workers")
+        _POOL = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS)
+    return _POOL
+
+
+def shutdown_analysis_pool() -> None:
+    """Shut down the analysis process pool if it was started."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(cancel_futures=True)
+        _POOL = None
+
+
+async def run_analysis(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a CPU-bound analysis function without blocking the event loop.
+
+    With ANALYSIS_WORKERS > 0 the call runs in a worker process, so it does
+    not hold the GIL of the API process; its arguments and result must be
+    picklable. Otherwise it runs in a worker thread.
+
+    Args:
+        func: Module-level analysis function (e.g. detect_motifs)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The value returned by func
+    """
+    pool = get_analysis_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,202 @@
+"""Streaming multipart/form-data upload handling."""
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ImportError:
+    # python-multipart < 0.0.13 only ships the `multipart` package
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# Part data is buffered up to this size before being handed to a worker thread for writing
+WRITE_CHUNK_SIZE = 1 << 20
+
+
+class UnsupportedUploadError(ValueError):
+    """Raised when an uploaded file's type is rejected before it is written out."""
+    pass
+
+
+async def stream_multipart_files(
+    request: Request,
+    dest_dir: Path,
+    field_names: Iterable[str],
+    default_suffix: str = ".wav",
+    allowed_suffixes: Optional[Iterable[str]] = None,
+    header_check: Optional[Callable[[bytes], bool]] = None,
+    header_size: int = 0
+) -> Dict[str, Path]:
+    """
+    Write file fields of a multipart request body straight to disk as it arrives.
+
+    Each expected field is written to dest_dir / f"{field}{suffix}", where the
+    suffix comes from the uploaded filename (default_suffix if it has none).
+    Unexpected fields are ignored. Part data is buffered in WRITE_CHUNK_SIZE
+    blocks and written from a worker thread, so disk I/O never blocks the
+    event loop and nothing is spooled to a temporary file first.
+
+    A file with a disallowed suffix, or a second file for a field already
+    received, is rejected as soon as its part headers arrive, and one whose first header_size bytes fail header_check as soon as
+    they do, so a bad upload never gets written out in full.
+
+    Args:
+        request: Incoming request with a multipart/form-data body
+        dest_dir: Directory to write the files into (must exist)
+        field_names: Form field names to save
+        default_suffix: File suffix used when the upload has no filename suffix
+        allowed_suffixes: Accepted file suffixes, compared case-insensitively (any if None)
+        header_check: Predicate on the first header_size bytes of each file
+        header_size: Number of leading bytes passed to header_check
+
+    Returns:
+        Dictionary mapping field name to written file path
+
+    Raises:
+        UnsupportedUploadError: If a file's suffix or header is rejected
+        ValueError: If the body is not multipart/form-data or a field is missing or repeated
+    """
+    expected = set(field_names)
+    allowed = {suffix.lower() for suffix in allowed_suffixes} if allowed_suffixes is not None else None
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data request body")
+
+    file_paths: Dict[str, Path] = {}
+    header_field: List[bytes] = []
+    header_value: List[bytes] = []
+    part_headers: Dict[bytes, bytes] = {}
+    current_path: Optional[Path] = None
+    current_name = ""
+    header_checked = True
+    current_buffer = bytearray()
+    pending: List[Tuple[Path, bytes]] = []
+    open_files: Dict[Path, BinaryIO] = {}
+
+    def on_part_begin() -> None:
+        part_headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.append(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.append(data[start:end])
+
+    def on_header_end() -> None:
+        part_headers[b"".join(header_field).lower()] = b"".join(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def check_header() -> None:
+        nonlocal header_checked
+        header_checked = True
+        if not header_check(bytes(current_buffer[:header_size])):
+            raise UnsupportedUploadError(f"Upload for {current_name} is not a supported file type")
+
+    def on_headers_finished() -> None:
+        nonlocal current_path, current_name, header_checked
+        _, options = parse_options_header(part_headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        if name not in expected or b"filename" not in options:
+            return
+        if name in file_paths:
+            # A repeated field would be appended to the same file and corrupt it
+            raise ValueError(f"Duplicate upload file: {name}")
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        suffix = Path(filename).suffix or default_suffix
+        if allowed is not None and suffix.lower() not in allowed:
+            raise UnsupportedUploadError(f"Unsupported file type for {name}: {suffix}")
+        current_path = dest_dir / f"{name}{suffix}"
+        current_name = name
+        header_checked = header_check is None
+        file_paths[name] = current_path
+        # Queue an empty write so the file is created even for an empty upload
+        pending.append((current_path, b""))
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if current_path is not None:
+            current_buffer.extend(data[start:end])
+
+    def on_part_end() -> None:
+        nonlocal current_path
+        if current_path is not None:
+            if not header_checked:
+                check_header()
+            pending.append((current_path, bytes(current_buffer)))
+            current_buffer.clear()
+            current_path = None
+
+    def write_pending() -> None:
+        for path, data in pending:
+            f = open_files.get(path)
+            if f is None:
+                f = open_files[path] = open(path, "wb", buffering=WRITE_CHUNK_SIZE)
+            f.write(data)
+        pending.clear()
+
+    def close_files() -> None:
+        for f in open_files.values():
+            f.close()
+
+    parser = multipart.MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if current_path is not None and not header_checked and len(current_buffer) >= header_size:
+                check_header()
+            if current_path is not None and len(current_buffer) >= WRITE_CHUNK_SIZE:
+                pending.append((current_path, bytes(current_buffer)))
+                current_buffer.clear()
+            if pending:
+                await run_in_threadpool(write_pending)
+        parser.finalize()
+        if pending:
+            await run_in_threadpool(write_pending)
+    finally:
+        await run_in_threadpool(close_files)
+
+    missing = expected - file_paths.keys()
+    if missing:
+        raise ValueError(f"Missing upload file(s): {', '.join(sorted(missing))}")
+
+    return file_paths
+
+
+def remove_stale_upload_dirs(root: Path, max_age_seconds: float) -> int:
+    """
+    Remove upload directories under root that have not been modified for max_age_seconds.
+
+    Args:
+        root: Directory holding one subdirectory per upload
+        max_age_seconds: Minimum age (by modification time) of a removed directory
+
+    Returns:
+        Number of directories removed
+    """
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+    return removed
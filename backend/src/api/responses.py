@@ -0,0 +1,122 @@
+"""Shared response classes and helpers for API routes."""
+import gzip
+import hashlib
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import orjson
+from fastapi import status
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# orjson options shared by every JSON payload we encode.
+# OPT_SERIALIZE_NUMPY lets numpy scalars/arrays from the analysis modules pass through unchanged.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Responses smaller than this are sent uncompressed (gzip overhead outweighs the savings)
+GZIP_MINIMUM_SIZE = 2048
+GZIP_COMPRESS_LEVEL = 5
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json module."""
+    
+    def render(self, content: Any) -> bytes:
+        """Encode content to JSON bytes."""
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def compute_etag(payload: bytes) -> str:
+    """Compute a strong ETag for an encoded response body."""
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header value matches an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Check whether an Accept-Encoding header value allows gzip."""
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def same_source(cached_source: Any, source: Any) -> bool:
+    """Check whether a cached payload was built from exactly the given source object(s)."""
+    if isinstance(source, tuple) and isinstance(cached_source, tuple):
+        return len(source) == len(cached_source) and all(a is b for a, b in zip(cached_source, source))
+    return cached_source is source
+
+
+def cached_json_response(
+    cache: Dict[Hashable, Tuple[Any, bytes, str, Optional[bytes]]],
+    key: Hashable,
+    source: Any,
+    build_payload: Callable[[], BaseModel],
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None
+) -> Response:
+    """
+    Serve a GET payload from the serialized JSON cache.
+    
+    The payload is built and encoded only when the cache has no entry for
+    key or the entry was built from a different source object. A
+    payload derived from several stored results passes them as a tuple, and
+    is rebuilt when any of them is replaced.
+    Payloads of at least GZIP_MINIMUM_SIZE bytes are gzip-compressed once at
+    the same time and served to clients that accept gzip. Responses carry an
+    ETag of the representation sent; a matching If-None-Match gets an empty
+    304 response.
+    
+    Args:
+        cache: One of the REFERENCE_*_JSON stores (or another payload cache of the same shape)
+        key: Cache key, normally the reference_id
+        source: Stored analysis result (or tuple of results) the payload is derived from
+        build_payload: Callable returning the response model to serialize
+        if_none_match: If-None-Match request header, if sent
+        accept_encoding: Accept-Encoding request header, if sent
+    
+    Returns:
+        Response with the pre-encoded JSON body, or 304 Not Modified
+    """
+    cached = cache.get(key)
+    if cached is None or not same_source(cached[0], source):
+        payload = build_payload().model_dump_json(by_alias=True).encode()
+        etag = compute_etag(payload)
+        gzipped = None
+        if len(payload) >= GZIP_MINIMUM_SIZE:
+            gzipped = gzip.compress(payload, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+        cached = (source, payload, etag, gzipped)
+        cache[key] = cached
+    _, payload, etag, gzipped = cached
+    
+    headers = {"ETag": etag}
+    if gzipped is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(accept_encoding):
+            payload = gzipped
+            headers["ETag"] = f'{etag[:-1]}-gzip"'
+            headers["Content-Encoding"] = "gzip"
+    
+    if etag_matches(if_none_match, headers["ETag"]):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
@@ -1,37 +1,52 @@
 """Reference track API routes."""
+import asyncio
 import os
 import shutil
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Annotated, Any, Dict, Optional, Tuple
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, status, Query, Body, Header
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 
+from api.analysis_pool import run_analysis
+from api.multipart_upload import stream_multipart_files, UnsupportedUploadError
+from api.responses import ORJSONResponse, cached_json_response
 from models.store import (
     REFERENCE_BUNDLES, REFERENCE_REGIONS, REFERENCE_MOTIFS, 
     REFERENCE_CALL_RESPONSE, REFERENCE_FILLS, REFERENCE_MOTIF_INSTANCES_RAW,
-    REFERENCE_SUBREGIONS, REFERENCE_ANNOTATIONS
+    REFERENCE_SUBREGIONS, REFERENCE_DENSITY_CURVES, REFERENCE_ANNOTATIONS,
+    REFERENCE_REGIONS_JSON, REFERENCE_MOTIFS_JSON, REFERENCE_CALL_RESPONSE_JSON,
+    REFERENCE_CALL_RESPONSE_LANES_JSON, REFERENCE_FILLS_JSON, REFERENCE_SUBREGIONS_JSON,
+    REFERENCE_MOTIFS_RECLUSTERED_JSON, MAX_RECLUSTERED_PAYLOADS, REFERENCE_MOTIF_SENSITIVITY_JSON,
+    REFERENCE_ANNOTATIONS_JSON, get_reference_lock
 )
+from models.reference_bundle import ReferenceBundle
 from models.region import Region
 from stem_ingest.ingest_service import load_reference_bundle
+from stem_ingest.audio_file import SUPPORTED_SUFFIXES, AUDIO_HEADER_SIZE, is_supported_audio_header
 from analysis.region_detector.region_detector import detect_regions
 from analysis.motif_detector.motif_detector import (
-    detect_motifs, MotifInstance, _cluster_motifs, _align_motifs_with_regions
+    detect_motifs, RawMotifInstances, _cluster_motifs, _align_motifs_with_regions
 )
 from analysis.motif_detector.config import (
     MotifSensitivityConfig,
     DEFAULT_MOTIF_SENSITIVITY,
-    normalize_sensitivity_config,
-    clamp_sensitivity
+    normalize_sensitivity_config
 )
 from analysis.call_response_detector.call_response_detector import detect_call_response, CallResponseConfig
 from analysis.call_response_detector.lanes_service import build_call_response_lanes
 from analysis.call_response_detector.lanes_models import CallResponseByStemResponse
 from analysis.fill_detector.fill_detector import detect_fills, FillConfig
 from analysis.subregions.service import compute_region_subregions, DensityCurves
-from analysis.subregions.models import RegionSubRegionsDTO
+from models.reference_responses import (
+    MotifGroupOut,
+    RegionsResponse, MotifsResponse, CallResponseResponse, FillsResponse, SubRegionsResponse,
+    MotifSensitivityResponse
+)
 from models.annotations import ReferenceAnnotations, RegionAnnotations, AnnotationBlock
 from config import DEFAULT_SUBREGION_BARS_PER_CHUNK, DEFAULT_SUBREGION_SILENCE_INTENSITY_THRESHOLD
 from config import (
@@ -44,25 +59,31 @@ from config import (
     DEFAULT_FILL_TRANSIENT_DENSITY_THRESHOLD_MULTIPLIER,
     DEFAULT_FILL_MIN_TRANSIENT_DENSITY,
     USE_FULL_MIX_FOR_LANE_VIEW,
-    VISUAL_COMPOSER_ENABLED
+    VISUAL_COMPOSER_ENABLED,
+    REFERENCE_TMPDIR
 )
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/reference", tags=["reference"])
+router = APIRouter(prefix="/reference", tags=["reference"], default_response_class=ORJSONResponse)
 
 # Temporary directory for uploaded files
-TEMP_DIR = Path("tmp/reference")
+TEMP_DIR = Path(REFERENCE_TMPDIR)
+
+# Multipart form fields expected by /upload
+UPLOAD_ROLES = ("drums", "bass", "vocals", "instruments", "full_mix")
 
 
+@lru_cache(maxsize=1)
 def _get_project_root() -> Path:
     """Get the project root directory (3 levels up from this file: api -> src -> backend -> root)."""
     return Path(__file__).resolve().parents[3]
 
 
+@lru_cache(maxsize=1)
 def _get_gallium_test_paths() -> Dict[str, Path]:
-    """Get file paths for Gallium test stems."""
+    """Get file paths for Gallium test stems (computed once; do not mutate the returned dict)."""
     root = _get_project_root() / "2. Test Data" / "Song-1-Gallium-MakeEmWatch-130BPM"
     return {
         "drums": root / "DRUMS.wav",
@@ -73,6 +94,39 @@ def _get_gallium_test_paths() -> Dict[str, Path]:
     }
 
 
+@lru_cache(maxsize=1)
+def _load_gallium_bundle() -> ReferenceBundle:
+    """Decode the Gallium test stems once per process (dev only)."""
+    return load_reference_bundle(_get_gallium_test_paths())
+
+
+def _require(store: Dict[str, Any], reference_id: str, detail: str) -> Any:
+    """
+    Look up a stored value for a reference, raising 404 if it is missing.
+    
+    Args:
+        store: One of the REFERENCE_* stores
+        reference_id: ID of the reference bundle
+        detail: Error detail returned when the value is missing
+    
+    Returns:
+        The stored value
+    
+    Raises:
+        HTTPException: 404 if the store has no entry for reference_id
+    """
+    value = store.get(reference_id)
+    if value is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return value
+
+
+def _invalidate_json_cache(reference_id: str, *caches: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]]) -> None:
+    """Drop cached JSON payloads for a reference after its analysis results change."""
+    for cache in caches:
+        cache.pop(reference_id, None)
+
+
 @router.get("/ping")
 async def ping():
     """Health check endpoint for reference API."""
@@ -96,9 +150,15 @@ async def create_gallium_dev_reference():
     # Get test file paths
     paths = _get_gallium_test_paths()
     
-    # Validate all files exist
+    # Validate all files exist (one listing of the stems directory instead of a stat per file)
+    stems_dir = paths["full_mix"].parent
+    try:
+        with os.scandir(stems_dir) as entries:
+            present = {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        present = set()
     for role, path in paths.items():
-        if not path.exists():
+        if path.name not in present:
             logger.error(f"Missing Gallium test file for {role}: {path}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,9 +170,10 @@ async def create_gallium_dev_reference():
     logger.info(f"Creating dev reference with ID: {reference_id}")
     
     try:
-        # Load reference bundle directly from file paths
+        # Stems are decoded on the first call only; each dev reference gets its own
+        # bundle (and sensitivity config) sharing the decoded audio
         logger.info(f"Loading reference bundle from test files")
-        bundle = load_reference_bundle(paths)
+        bundle = _load_gallium_bundle().copy()
         
         # Store in memory (same as normal upload)
         REFERENCE_BUNDLES[reference_id] = bundle
@@ -134,18 +195,13 @@ async def create_gallium_dev_reference():
 
 
 @router.post("/upload")
-async def upload_reference(
-    drums: UploadFile = File(...),
-    bass: UploadFile = File(...),
-    vocals: UploadFile = File(...),
-    instruments: UploadFile = File(...),
-    full_mix: UploadFile = File(...)
-):
+async def upload_reference(request: Request):
     """
     Upload reference track stems and full mix.
     
     Accepts 5 audio files (drums, bass, vocals, instruments, full_mix)
-    and creates a ReferenceBundle.
+    as multipart/form-data and creates a ReferenceBundle. The request body
+    is streamed straight into the reference's temporary directory.
     
     Returns:
         JSON with referenceId for the uploaded bundle
@@ -158,37 +214,23 @@ async def upload_reference(
     ref_dir.mkdir(parents=True, exist_ok=True)
     
     try:
-        # Map of roles to file paths
-        file_paths: Dict[str, Path] = {}
-        
-        # Save uploaded files
-        uploads = {
-            "drums": drums,
-            "bass": bass,
-            "vocals": vocals,
-            "instruments": instruments,
-            "full_mix": full_mix
-        }
-        
-        for role, upload_file in uploads.items():
-            # Get file extension from original filename or content type
-            original_filename = upload_file.filename or f"{role}.wav"
-            file_ext = Path(original_filename).suffix or ".wav"
-            
-            # Save to temporary directory
-            file_path = ref_dir / f"{role}{file_ext}"
-            
-            logger.info(f"Saving {role} to {file_path}")
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(upload_file.file, f)
-            
-            file_paths[role] = file_path
+        # Save uploaded files as they stream in
+        logger.info(f"Saving uploaded files to {ref_dir}")
+        # Files that are not WAV/AIFF are rejected from their filename and first bytes
+        file_paths = await stream_multipart_files(
+            request, ref_dir, UPLOAD_ROLES,
+            allowed_suffixes=SUPPORTED_SUFFIXES,
+            header_check=is_supported_audio_header,
+            header_size=AUDIO_HEADER_SIZE
+        )
         
         # Load reference bundle
         logger.info(f"Loading reference bundle from {ref_dir}")
         bundle = load_reference_bundle(file_paths)
         
+        # The stems are in memory now; free the staged copies right away (they may be held in RAM by /dev/shm)
+        shutil.rmtree(ref_dir, ignore_errors=True)
+        
         # Store in memory
         REFERENCE_BUNDLES[reference_id] = bundle
         logger.info(f"Stored reference bundle {reference_id}: {bundle}")
@@ -200,6 +242,14 @@ async def upload_reference(
             "key": bundle.key
         }
     
+    except UnsupportedUploadError as e:
+        logger.warning(f"Rejected upload for reference {reference_id}: {e}")
+        shutil.rmtree(ref_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    
     except Exception as e:
         logger.error(f"Error uploading reference {reference_id}: {e}", exc_info=True)
         # Clean up on error
@@ -229,112 +279,118 @@ async def analyze_reference(
     logger.info(f"Starting analysis for reference_id: {reference_id}")
     
     # Look up reference bundle
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
-    
-    bundle = REFERENCE_BUNDLES[reference_id]
-    
-    try:
-        # Detect regions
-        logger.info(f"Detecting regions for bundle: {bundle}")
-        regions = detect_regions(bundle)
-        
-        # Store regions
-        REFERENCE_REGIONS[reference_id] = regions
-        logger.info(f"Detected {len(regions)} regions for reference {reference_id}")
-        
-        # Detect motifs using stored sensitivity config
-        # The query parameter is kept for backward compatibility but we prefer stored config
-        # If query param differs from default, it overrides stored config
-        # NOTE: For the Region Map stem lanes, we use stem-only motif analysis (no full-mix motifs).
-        # Each motif instance is explicitly tagged with its stem_role for per-stem lane visualization.
-        if motif_sensitivity != DEFAULT_MOTIF_SENSITIVITY:
-            # Query parameter provided and differs from default, use it for all stems
-            logger.info(f"Detecting motifs for bundle: {bundle} with sensitivity={motif_sensitivity} (from query param, overriding stored config)")
-            instances, groups = detect_motifs(bundle, regions, sensitivity=motif_sensitivity, exclude_full_mix=True)
-        else:
-            # Use stored per-stem sensitivity config
-            logger.info(f"Detecting motifs for bundle: {bundle} with sensitivity_config={bundle.motif_sensitivity_config}")
-            instances, groups = detect_motifs(bundle, regions, sensitivity_config=bundle.motif_sensitivity_config, exclude_full_mix=True)
-        
-        # Store raw instances (before clustering) for re-clustering with different sensitivity
-        # Create deep copies to avoid modifying the clustered instances
-        raw_instances = []
-        for inst in instances:
-            raw_inst = MotifInstance(
-                id=inst.id,
-                stem_role=inst.stem_role,
-                start_time=inst.start_time,
-                end_time=inst.end_time,
-                features=inst.features.copy(),  # Copy numpy array
-                group_id=None,  # Reset clustering
-                is_variation=False,  # Reset variation flag
-                region_ids=inst.region_ids.copy()  # Keep region alignment
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
+    
+    # Serialize analysis runs for this reference so their store writes don't interleave
+    async with get_reference_lock(reference_id):
+        try:
+            # Detect regions (CPU-bound stages run in the analysis pool to keep the event loop free)
+            logger.info(f"Detecting regions for bundle: {bundle}")
+            regions = await run_analysis(detect_regions, bundle)
+            logger.info(f"Detected {len(regions)} regions for reference {reference_id}")
+            
+            async def detect_motifs_and_call_response():
+                # Detect motifs using stored sensitivity config
+                # The query parameter is kept for backward compatibility but we prefer stored config
+                # If query param differs from default, it overrides stored config
+                # NOTE: For the Region Map stem lanes, we use stem-only motif analysis (no full-mix motifs).
+                # Each motif instance is explicitly tagged with its stem_role for per-stem lane visualization.
+                if motif_sensitivity != DEFAULT_MOTIF_SENSITIVITY:
+                    # Query parameter provided and differs from default, use it for all stems
+                    logger.info(f"Detecting motifs for bundle: {bundle} with sensitivity={motif_sensitivity} (from query param, overriding stored config)")
+                    instances, groups = await run_analysis(
+                        detect_motifs, bundle, regions, sensitivity=motif_sensitivity, exclude_full_mix=True
+                    )
+                else:
+                    # Use stored per-stem sensitivity config
+                    logger.info(f"Detecting motifs for bundle: {bundle} with sensitivity_config={bundle.motif_sensitivity_config}")
+                    instances, groups = await run_analysis(
+                        detect_motifs, bundle, regions, sensitivity_config=bundle.motif_sensitivity_config, exclude_full_mix=True
+                    )
+                logger.info(f"Detected {len(instances)} motif instances in {len(groups)} groups for reference {reference_id}")
+                
+                # Detect call-response relationships
+                # The Region Map's 5-layer view is stem-centric; we intentionally ignore full-mix motifs here.
+                logger.info(f"Detecting call-response relationships for reference {reference_id}")
+                call_response_config = CallResponseConfig(
+                    min_offset_bars=DEFAULT_CALL_RESPONSE_MIN_OFFSET_BARS,
+                    max_offset_bars=DEFAULT_CALL_RESPONSE_MAX_OFFSET_BARS,
+                    min_similarity=DEFAULT_CALL_RESPONSE_MIN_SIMILARITY,
+                    min_confidence=DEFAULT_CALL_RESPONSE_MIN_CONFIDENCE,
+                    use_full_mix=False  # Stem-only mode for 5-layer Region Map view
+                )
+                call_response_pairs = await run_analysis(
+                    detect_call_response, instances, regions, bundle.bpm, config=call_response_config
+                )
+                logger.info(f"Detected {len(call_response_pairs)} call-response pairs for reference {reference_id}")
+                return instances, groups, call_response_pairs
+            
+            # Fills depend only on the bundle and regions, so they are detected alongside motifs
+            logger.info(f"Detecting fills for reference {reference_id}")
+            fill_config = FillConfig(
+                pre_boundary_window_bars=DEFAULT_FILL_PRE_BOUNDARY_WINDOW_BARS,
+                transient_density_threshold_multiplier=DEFAULT_FILL_TRANSIENT_DENSITY_THRESHOLD_MULTIPLIER,
+                min_transient_density=DEFAULT_FILL_MIN_TRANSIENT_DENSITY
             )
-            raw_instances.append(raw_inst)
-        REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = raw_instances
-        
-        # Store motifs
-        REFERENCE_MOTIFS[reference_id] = (instances, groups)
-        logger.info(f"Detected {len(instances)} motif instances in {len(groups)} groups for reference {reference_id}")
-        
-        # Detect call-response relationships
-        # The Region Map's 5-layer view is stem-centric; we intentionally ignore full-mix motifs here.
-        logger.info(f"Detecting call-response relationships for reference {reference_id}")
-        call_response_config = CallResponseConfig(
-            min_offset_bars=DEFAULT_CALL_RESPONSE_MIN_OFFSET_BARS,
-            max_offset_bars=DEFAULT_CALL_RESPONSE_MAX_OFFSET_BARS,
-            min_similarity=DEFAULT_CALL_RESPONSE_MIN_SIMILARITY,
-            min_confidence=DEFAULT_CALL_RESPONSE_MIN_CONFIDENCE,
-            use_full_mix=False  # Stem-only mode for 5-layer Region Map view
-        )
-        call_response_pairs = detect_call_response(instances, regions, bundle.bpm, config=call_response_config)
-        
-        # Store call-response pairs
-        REFERENCE_CALL_RESPONSE[reference_id] = call_response_pairs
-        logger.info(f"Detected {len(call_response_pairs)} call-response pairs for reference {reference_id}")
-        
-        # Detect fills
-        logger.info(f"Detecting fills for reference {reference_id}")
-        fill_config = FillConfig(
-            pre_boundary_window_bars=DEFAULT_FILL_PRE_BOUNDARY_WINDOW_BARS,
-            transient_density_threshold_multiplier=DEFAULT_FILL_TRANSIENT_DENSITY_THRESHOLD_MULTIPLIER,
-            min_transient_density=DEFAULT_FILL_MIN_TRANSIENT_DENSITY
-        )
-        fills = detect_fills(bundle, regions, config=fill_config)
-        
-        # Store fills
-        REFERENCE_FILLS[reference_id] = fills
-        logger.info(f"Detected {len(fills)} fills for reference {reference_id}")
+            (instances, groups, call_response_pairs), fills = await asyncio.gather(
+                detect_motifs_and_call_response(),
+                run_analysis(detect_fills, bundle, regions, config=fill_config)
+            )
+            logger.info(f"Detected {len(fills)} fills for reference {reference_id}")
+            
+            # Raw instances (before clustering) are kept for re-clustering with different sensitivity
+            # The struct-of-arrays snapshot copies features and drops clustering state
+            raw_instances = RawMotifInstances.from_instances(instances)
+            
+            # Publish every result in one synchronous block (no await until it is done), so concurrent
+            # GETs never see new regions next to the previous run's motifs, fills or subregions. A stage
+            # that raised above left the stores untouched.
+            REFERENCE_REGIONS[reference_id] = regions
+            REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = raw_instances
+            REFERENCE_MOTIFS[reference_id] = (instances, groups)
+            REFERENCE_CALL_RESPONSE[reference_id] = call_response_pairs
+            REFERENCE_FILLS[reference_id] = fills
+            
+            # Subregions and serialized payloads were derived from the previous analysis
+            REFERENCE_SUBREGIONS.pop(reference_id, None)
+            _invalidate_json_cache(
+                reference_id,
+                REFERENCE_REGIONS_JSON, REFERENCE_MOTIFS_JSON, REFERENCE_MOTIFS_RECLUSTERED_JSON,
+                REFERENCE_CALL_RESPONSE_JSON, REFERENCE_CALL_RESPONSE_LANES_JSON, REFERENCE_FILLS_JSON,
+                REFERENCE_SUBREGIONS_JSON
+            )
+            
+            return {
+                "referenceId": reference_id,
+                "regionCount": len(regions),
+                "motifInstanceCount": len(instances),
+                "motifGroupCount": len(groups),
+                "callResponseCount": len(call_response_pairs),
+                "fillCount": len(fills),
+                "status": "ok"
+            }
         
-        return {
-            "referenceId": reference_id,
-            "regionCount": len(regions),
-            "motifInstanceCount": len(instances),
-            "motifGroupCount": len(groups),
-            "callResponseCount": len(call_response_pairs),
-            "fillCount": len(fills),
-            "status": "ok"
-        }
-    
-    except Exception as e:
-        logger.error(f"Error analyzing reference {reference_id}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to analyze reference: {str(e)}"
-        )
+        except Exception as e:
+            logger.error(f"Error analyzing reference {reference_id}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to analyze reference: {str(e)}"
+            )
 
 
-@router.get("/{reference_id}/regions")
-async def get_regions(reference_id: str):
+@router.get("/{reference_id}/regions", response_model=RegionsResponse)
+async def get_regions(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get detected regions for a reference bundle.
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON list of regions
@@ -342,47 +398,29 @@ async def get_regions(reference_id: str):
     logger.info(f"Getting regions for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if regions have been detected
-    if reference_id not in REFERENCE_REGIONS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Regions not found for reference {reference_id}. Run /analyze first."
-        )
+    regions = _require(REFERENCE_REGIONS, reference_id, f"Regions not found for reference {reference_id}. Run /analyze first.")
     
-    regions = REFERENCE_REGIONS[reference_id]
-    
-    # Convert Region dataclasses to dictionaries for JSON serialization
-    regions_dict = []
-    for region in regions:
-        regions_dict.append({
-            "id": region.id,
-            "name": region.name,
-            "type": region.type,
-            "start": region.start,
-            "end": region.end,
-            "duration": region.duration,
-            "motifs": region.motifs,
-            "fills": region.fills,
-            "callResponse": region.callResponse
-        })
+    def build_payload() -> RegionsResponse:
+        return RegionsResponse(
+            reference_id=reference_id,
+            regions=regions,
+            count=len(regions)
+        )
     
-    return {
-        "referenceId": reference_id,
-        "regions": regions_dict,
-        "count": len(regions_dict)
-    }
+    return cached_json_response(
+        REFERENCE_REGIONS_JSON, reference_id, regions, build_payload, if_none_match, accept_encoding
+    )
 
 
-@router.get("/{reference_id}/motifs")
+@router.get("/{reference_id}/motifs", response_model=MotifsResponse)
 async def get_motifs(
     reference_id: str,
-    sensitivity: Optional[float] = Query(None, ge=0.0, le=1.0, description="Optional: Re-cluster motifs with different sensitivity (0.0 = strict, 1.0 = loose)")
+    sensitivity: Optional[float] = Query(None, ge=0.0, le=1.0, description="Optional: Re-cluster motifs with different sensitivity (0.0 = strict, 1.0 = loose)"),
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
 ):
     """
     Get detected motifs for a reference bundle.
@@ -390,6 +428,8 @@ async def get_motifs(
     Args:
         reference_id: ID of the reference bundle
         sensitivity: Optional sensitivity parameter to re-cluster motifs with different threshold
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with motif instances and groups
@@ -397,88 +437,70 @@ async def get_motifs(
     logger.info(f"Getting motifs for reference_id: {reference_id}, sensitivity={sensitivity}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if motifs have been detected
-    if reference_id not in REFERENCE_MOTIF_INSTANCES_RAW:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Motifs not found for reference {reference_id}. Run /analyze first."
-        )
+    raw_instances = _require(REFERENCE_MOTIF_INSTANCES_RAW, reference_id, f"Motifs not found for reference {reference_id}. Run /analyze first.")
     
     # Get regions for re-alignment
-    if reference_id not in REFERENCE_REGIONS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Regions not found for reference {reference_id}. Run /analyze first."
-        )
+    regions = _require(REFERENCE_REGIONS, reference_id, f"Regions not found for reference {reference_id}. Run /analyze first.")
     
-    regions = REFERENCE_REGIONS[reference_id]
-    raw_instances = REFERENCE_MOTIF_INSTANCES_RAW[reference_id]
-    
-    # If sensitivity is provided and different from stored, re-cluster
+    # If sensitivity is provided, serve (re-clustering on first request) that sensitivity's payload
     if sensitivity is not None:
-        logger.info(f"Re-clustering motifs with sensitivity={sensitivity}")
-        # Create fresh copies of instances for re-clustering
-        instances_to_cluster = []
-        for raw_inst in raw_instances:
-            fresh_inst = MotifInstance(
-                id=raw_inst.id,
-                stem_role=raw_inst.stem_role,
-                start_time=raw_inst.start_time,
-                end_time=raw_inst.end_time,
-                features=raw_inst.features.copy(),
-                group_id=None,
-                is_variation=False,
-                region_ids=[]
+        def build_reclustered_payload() -> MotifsResponse:
+            logger.info(f"Re-clustering motifs with sensitivity={sensitivity}")
+            # Create fresh copies of instances for re-clustering
+            instances_to_cluster = raw_instances.to_instances(include_region_ids=False)
+            
+            # Re-cluster with new sensitivity
+            instances, groups = _cluster_motifs(
+                instances_to_cluster, sensitivity, feature_matrix=raw_instances.features
             )
-            instances_to_cluster.append(fresh_inst)
-        
-        # Re-cluster with new sensitivity
-        instances, groups = _cluster_motifs(instances_to_cluster, sensitivity)
+            
+            # Re-align with regions
+            _align_motifs_with_regions(instances, regions)
+            
+            return _build_motifs_payload(reference_id, instances, groups)
         
-        # Re-align with regions
-        _align_motifs_with_regions(instances, regions)
-    else:
-        # Use stored clustering
-        instances, groups = REFERENCE_MOTIFS[reference_id]
-    
-    # Convert MotifInstance dataclasses to dictionaries for JSON serialization
-    instances_dict = []
-    for inst in instances:
-        instances_dict.append({
-            "id": inst.id,
-            "stemRole": inst.stem_role,
-            "startTime": inst.start_time,
-            "endTime": inst.end_time,
-            "duration": inst.duration,
-            "groupId": inst.group_id,
-            "isVariation": inst.is_variation,
-            "regionIds": inst.region_ids
-        })
-    
-    # Convert MotifGroup dataclasses to dictionaries
-    groups_dict = []
-    for group in groups:
-        groups_dict.append({
-            "id": group.id,
-            "label": group.label,
-            "memberIds": [m.id for m in group.members],
-            "memberCount": len(group.members),
-            "variationCount": len(group.variations)
-        })
-    
-    return {
-        "referenceId": reference_id,
-        "instances": instances_dict,
-        "groups": groups_dict,
-        "instanceCount": len(instances_dict),
-        "groupCount": len(groups_dict)
-    }
+        # Re-clustered payloads are memoized per sensitivity until motifs or regions are re-detected
+        reclustered = REFERENCE_MOTIFS_RECLUSTERED_JSON.setdefault(reference_id, OrderedDict())
+        # Rounded only for the key, so float noise from a slider doesn't fill the cache with near-duplicates;
+        # the payload is clustered at the sensitivity the first request for that key asked for
+        key = (round(sensitivity, 4),)
+        response = cached_json_response(
+            reclustered,
+            key,
+            (raw_instances, regions),
+            build_reclustered_payload,
+            if_none_match,
+            accept_encoding
+        )
+        reclustered.move_to_end(key)
+        while len(reclustered) > MAX_RECLUSTERED_PAYLOADS:
+            reclustered.popitem(last=False)
+        return response
+    
+    # Use stored clustering
+    motifs = _require(REFERENCE_MOTIFS, reference_id, f"Motifs not found for reference {reference_id}. Run /analyze first.")
+    return cached_json_response(
+        REFERENCE_MOTIFS_JSON,
+        reference_id,
+        motifs,
+        lambda: _build_motifs_payload(reference_id, *motifs),
+        if_none_match,
+        accept_encoding
+    )
+
+
+def _build_motifs_payload(reference_id: str, instances: list, groups: list) -> MotifsResponse:
+    """Build the /motifs response model from motif instances and groups."""
+    return MotifsResponse(
+        reference_id=reference_id,
+        instances=instances,
+        groups=[MotifGroupOut.from_group(group) for group in groups],
+        instance_count=len(instances),
+        group_count=len(groups)
+    )
 
 
 class MotifSensitivityUpdate(BaseModel):
@@ -487,15 +509,22 @@ class MotifSensitivityUpdate(BaseModel):
     bass: Optional[float] = Field(None, ge=0.0, le=1.0, description="Bass sensitivity (0.0 = strict, 1.0 = loose)")
     vocals: Optional[float] = Field(None, ge=0.0, le=1.0, description="Vocals sensitivity (0.0 = strict, 1.0 = loose)")
     instruments: Optional[float] = Field(None, ge=0.0, le=1.0, description="Instruments sensitivity (0.0 = strict, 1.0 = loose)")
+    
+    class Config:
+        extra = "forbid"  # Reject misspelled stem names instead of silently ignoring them
 
 
-@router.get("/{reference_id}/motif-sensitivity")
-async def get_motif_sensitivity(reference_id: str):
+@router.get("/{reference_id}/motif-sensitivity", response_model=MotifSensitivityResponse)
+async def get_motif_sensitivity(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None
+):
     """
     Get motif sensitivity configuration for a reference bundle.
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
     
     Returns:
         JSON with motif sensitivity configuration
@@ -503,18 +532,17 @@ async def get_motif_sensitivity(reference_id: str):
     logger.info(f"Getting motif sensitivity for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
-    bundle = REFERENCE_BUNDLES[reference_id]
+    # PATCH swaps in a new config dict, which invalidates the cached payload
+    config = bundle.motif_sensitivity_config
     
-    return {
-        "referenceId": reference_id,
-        "motifSensitivityConfig": bundle.motif_sensitivity_config
-    }
+    def build_payload() -> MotifSensitivityResponse:
+        return MotifSensitivityResponse(reference_id=reference_id, motif_sensitivity_config=config)
+    
+    return cached_json_response(
+        REFERENCE_MOTIF_SENSITIVITY_JSON, reference_id, config, build_payload, if_none_match
+    )
 
 
 @router.patch("/{reference_id}/motif-sensitivity")
@@ -535,48 +563,31 @@ async def update_motif_sensitivity(
     logger.info(f"Updating motif sensitivity for reference_id: {reference_id}, update={update}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
-    bundle = REFERENCE_BUNDLES[reference_id]
+    # Pydantic already enforces the [0.0, 1.0] range; normalization clamps every value to the
+    # safe range [0.05, 0.95], which prevents extremes that could lead to no motifs being detected
+    update_dict = update.model_dump(exclude_unset=True, exclude_none=True)
     
-    # Validate and merge provided values
-    update_dict = update.model_dump(exclude_unset=True)
+    # Swap in a new config instead of mutating the current one. No lock is needed (and taking the
+    # reference lock would stall this PATCH for a whole /analyze run): the read and the assignment
+    # happen without an await in between, and a running analysis keeps the config it started with.
+    new_config = normalize_sensitivity_config({**bundle.motif_sensitivity_config, **update_dict})
+    bundle.motif_sensitivity_config = new_config
     
-    # Clamp values to safe range [0.05, 0.95] even if they're in valid [0.0, 1.0] range
-    # This prevents extreme values that could lead to no motifs being detected
-    clamped_dict = {}
     for key, value in update_dict.items():
-        if value is not None:
-            # Validate value is in range [0.0, 1.0] (Pydantic Field already does this, but double-check)
-            if value < 0.0 or value > 1.0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid sensitivity value for {key}: {value}. Must be between 0.0 and 1.0"
-                )
-            # Clamp to safe range [0.05, 0.95]
-            clamped_value = clamp_sensitivity(value)
-            if clamped_value != value:
-                logger.info(
-                    f"[MotifSensitivity] Clamped {key} sensitivity from {value} to {clamped_value} "
-                    "(extreme values can prevent motif detection)"
-                )
-            clamped_dict[key] = clamped_value
-    
-    # Merge provided keys into existing config
-    bundle.motif_sensitivity_config.update(clamped_dict)
-    
-    # Normalize the entire config to ensure all values are in safe range
-    bundle.motif_sensitivity_config = normalize_sensitivity_config(bundle.motif_sensitivity_config)
+        clamped_value = new_config[key]
+        if clamped_value != value:
+            logger.info(
+                f"[MotifSensitivity] Clamped {key} sensitivity from {value} to {clamped_value} "
+                "(extreme values can prevent motif detection)"
+            )
     
     logger.info(f"Updated motif sensitivity config for {reference_id}: {bundle.motif_sensitivity_config}")
     
     return {
         "referenceId": reference_id,
-        "motifSensitivityConfig": bundle.motif_sensitivity_config
+        "motifSensitivityConfig": dict(bundle.motif_sensitivity_config)
     }
 
 
@@ -597,71 +608,64 @@ async def reanalyze_motifs(reference_id: str):
     logger.info(f"Re-analyzing motifs for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
-    
-    bundle = REFERENCE_BUNDLES[reference_id]
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if regions have been detected
-    if reference_id not in REFERENCE_REGIONS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Regions not found for reference {reference_id}. Run /analyze first."
-        )
-    
-    regions = REFERENCE_REGIONS[reference_id]
-    
-    try:
-        # Detect motifs using stored sensitivity config
-        logger.info(f"Re-detecting motifs for bundle: {bundle} with sensitivity_config={bundle.motif_sensitivity_config}")
-        # NOTE: For the Region Map stem lanes, we use stem-only motif analysis (no full-mix motifs).
-        instances, groups = detect_motifs(bundle, regions, sensitivity_config=bundle.motif_sensitivity_config, exclude_full_mix=True)
-        
-        # Store raw instances (before clustering) for re-clustering with different sensitivity
-        raw_instances = []
-        for inst in instances:
-            raw_inst = MotifInstance(
-                id=inst.id,
-                stem_role=inst.stem_role,
-                start_time=inst.start_time,
-                end_time=inst.end_time,
-                features=inst.features.copy(),  # Copy numpy array
-                group_id=None,  # Reset clustering
-                is_variation=False,  # Reset variation flag
-                region_ids=inst.region_ids.copy()  # Keep region alignment
+    regions = _require(REFERENCE_REGIONS, reference_id, f"Regions not found for reference {reference_id}. Run /analyze first.")
+    
+    # Serialize with other analysis runs for this reference
+    async with get_reference_lock(reference_id):
+        try:
+            # Detect motifs using stored sensitivity config
+            logger.info(f"Re-detecting motifs for bundle: {bundle} with sensitivity_config={bundle.motif_sensitivity_config}")
+            # NOTE: For the Region Map stem lanes, we use stem-only motif analysis (no full-mix motifs).
+            instances, groups = await run_analysis(
+                detect_motifs, bundle, regions, sensitivity_config=bundle.motif_sensitivity_config, exclude_full_mix=True
             )
-            raw_instances.append(raw_inst)
-        REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = raw_instances
-        
-        # Store motifs
-        REFERENCE_MOTIFS[reference_id] = (instances, groups)
-        logger.info(f"Re-detected {len(instances)} motif instances in {len(groups)} groups for reference {reference_id}")
+            
+            # Store raw instances (before clustering) for re-clustering with different sensitivity
+            REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = RawMotifInstances.from_instances(instances)
+            
+            # Store motifs
+            REFERENCE_MOTIFS[reference_id] = (instances, groups)
+            logger.info(f"Re-detected {len(instances)} motif instances in {len(groups)} groups for reference {reference_id}")
+            
+            # Subregions and stem lanes are derived from motifs, so they need rebuilding too
+            REFERENCE_SUBREGIONS.pop(reference_id, None)
+            _invalidate_json_cache(
+                reference_id,
+                REFERENCE_MOTIFS_JSON, REFERENCE_MOTIFS_RECLUSTERED_JSON,
+                REFERENCE_CALL_RESPONSE_LANES_JSON, REFERENCE_SUBREGIONS_JSON
+            )
+            
+            return {
+                "referenceId": reference_id,
+                "motifInstanceCount": len(instances),
+                "motifGroupCount": len(groups),
+                "status": "ok"
+            }
         
-        return {
-            "referenceId": reference_id,
-            "motifInstanceCount": len(instances),
-            "motifGroupCount": len(groups),
-            "status": "ok"
-        }
-    
-    except Exception as e:
-        logger.error(f"Error re-analyzing motifs for reference {reference_id}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to re-analyze motifs: {str(e)}"
-        )
+        except Exception as e:
+            logger.error(f"Error re-analyzing motifs for reference {reference_id}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to re-analyze motifs: {str(e)}"
+            )
 
 
-@router.get("/{reference_id}/call-response")
-async def get_call_response(reference_id: str):
+@router.get("/{reference_id}/call-response", response_model=CallResponseResponse)
+async def get_call_response(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get detected call-response pairs for a reference bundle.
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with call-response pairs
@@ -669,48 +673,29 @@ async def get_call_response(reference_id: str):
     logger.info(f"Getting call-response pairs for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if call-response pairs have been detected
-    if reference_id not in REFERENCE_CALL_RESPONSE:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Call-response pairs not found for reference {reference_id}. Run /analyze first."
-        )
+    pairs = _require(REFERENCE_CALL_RESPONSE, reference_id, f"Call-response pairs not found for reference {reference_id}. Run /analyze first.")
     
-    pairs = REFERENCE_CALL_RESPONSE[reference_id]
-    
-    # Convert CallResponsePair dataclasses to dictionaries for JSON serialization
-    pairs_dict = []
-    for pair in pairs:
-        pairs_dict.append({
-            "id": pair.id,
-            "fromMotifId": pair.from_motif_id,
-            "toMotifId": pair.to_motif_id,
-            "fromStemRole": pair.from_stem_role,
-            "toStemRole": pair.to_stem_role,
-            "fromTime": pair.from_time,
-            "toTime": pair.to_time,
-            "timeOffset": pair.time_offset,
-            "confidence": pair.confidence,
-            "regionId": pair.region_id,
-            "isInterStem": pair.is_inter_stem,
-            "isIntraStem": pair.is_intra_stem
-        })
+    def build_payload() -> CallResponseResponse:
+        return CallResponseResponse(
+            reference_id=reference_id,
+            pairs=pairs,
+            count=len(pairs)
+        )
     
-    return {
-        "referenceId": reference_id,
-        "pairs": pairs_dict,
-        "count": len(pairs_dict)
-    }
+    return cached_json_response(
+        REFERENCE_CALL_RESPONSE_JSON, reference_id, pairs, build_payload, if_none_match, accept_encoding
+    )
 
 
 @router.get("/{reference_id}/call-response-by-stem", response_model=CallResponseByStemResponse)
-async def get_call_response_by_stem(reference_id: str):
+async def get_call_response_by_stem(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get call-response patterns organized by stem lanes.
     
@@ -720,6 +705,8 @@ async def get_call_response_by_stem(reference_id: str):
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         CallResponseByStemResponse with lanes organized by stem
@@ -727,87 +714,77 @@ async def get_call_response_by_stem(reference_id: str):
     logger.info(f"Getting call-response by stem for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
-    
-    bundle = REFERENCE_BUNDLES[reference_id]
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if regions have been detected
-    if reference_id not in REFERENCE_REGIONS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Regions not found for reference {reference_id}. Run /analyze first."
-        )
-    
-    regions = REFERENCE_REGIONS[reference_id]
+    regions = _require(REFERENCE_REGIONS, reference_id, f"Regions not found for reference {reference_id}. Run /analyze first.")
     
     # Check if call-response pairs have been detected
-    if reference_id not in REFERENCE_CALL_RESPONSE:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Call-response pairs not found for reference {reference_id}. Run /analyze first."
-        )
+    call_response_pairs = _require(REFERENCE_CALL_RESPONSE, reference_id, f"Call-response pairs not found for reference {reference_id}. Run /analyze first.")
     
-    call_response_pairs = REFERENCE_CALL_RESPONSE[reference_id]
-    
-    # NOTE: The Region Map stem lanes are intended to be per-stem only; full-mix motifs are ignored here by design.
-    # Filter out any pairs involving full_mix unless explicitly enabled
-    if not USE_FULL_MIX_FOR_LANE_VIEW:
-        stem_only_pairs = [
-            pair for pair in call_response_pairs
-            if pair.from_stem_role != "full_mix" and pair.to_stem_role != "full_mix"
-        ]
-        filtered_count = len(call_response_pairs) - len(stem_only_pairs)
-        if filtered_count > 0:
-            logger.info(
-                f"[CallResponseLanes] Filtered out {filtered_count} full-mix pairs (USE_FULL_MIX_FOR_LANE_VIEW=False)"
-            )
-        call_response_pairs = stem_only_pairs
-    else:
-        logger.warning(
-            "[CallResponseLanes] USE_FULL_MIX_FOR_LANE_VIEW=True - full-mix motifs will be included (not recommended for stem lanes)"
-        )
+    raw_instances = REFERENCE_MOTIF_INSTANCES_RAW.get(reference_id)
     
-    # Get motif instances if available (for getting end times)
-    # Filter to only per-stem motifs (exclude full_mix)
-    motif_instances = None
-    if reference_id in REFERENCE_MOTIF_INSTANCES_RAW:
-        raw_instances = REFERENCE_MOTIF_INSTANCES_RAW[reference_id]
+    def build_payload() -> CallResponseByStemResponse:
+        pairs = call_response_pairs
+        
+        # NOTE: The Region Map stem lanes are intended to be per-stem only; full-mix motifs are ignored here by design.
+        # Filter out any pairs involving full_mix unless explicitly enabled
         if not USE_FULL_MIX_FOR_LANE_VIEW:
-            # Filter out full_mix motif instances
-            stem_only_instances = [
-                inst for inst in raw_instances
-                if inst.stem_role != "full_mix"
+            stem_only_pairs = [
+                pair for pair in pairs
+                if pair.from_stem_role != "full_mix" and pair.to_stem_role != "full_mix"
             ]
-            filtered_motif_count = len(raw_instances) - len(stem_only_instances)
-            if filtered_motif_count > 0:
+            filtered_count = len(pairs) - len(stem_only_pairs)
+            if filtered_count > 0:
                 logger.info(
-                    f"[CallResponseLanes] Filtered out {filtered_motif_count} full-mix motif instances (USE_FULL_MIX_FOR_LANE_VIEW=False)"
+                    f"[CallResponseLanes] Filtered out {filtered_count} full-mix pairs (USE_FULL_MIX_FOR_LANE_VIEW=False)"
                 )
-            motif_instances = stem_only_instances
+            pairs = stem_only_pairs
         else:
-            motif_instances = raw_instances
-    
-    # Log summary of per-stem motifs being used
-    per_stem_motif_count = len(motif_instances) if motif_instances else 0
-    logger.info(
-        f"[CallResponseLanes] Using {per_stem_motif_count} per-stem motifs; full-mix motifs disabled (USE_FULL_MIX_FOR_LANE_VIEW=False)"
-    )
-    
-    # Build lanes
-    try:
-        lanes_response = build_call_response_lanes(
+            logger.warning(
+                "[CallResponseLanes] USE_FULL_MIX_FOR_LANE_VIEW=True - full-mix motifs will be included (not recommended for stem lanes)"
+            )
+        
+        # Get motif instances if available (for getting end times)
+        # Filter to only per-stem motifs (exclude full_mix)
+        motif_instances = None
+        if raw_instances is not None:
+            if not USE_FULL_MIX_FOR_LANE_VIEW:
+                # Filter out full_mix motif instances
+                stem_only_instances = [
+                    inst for inst in raw_instances
+                    if inst.stem_role != "full_mix"
+                ]
+                filtered_motif_count = len(raw_instances) - len(stem_only_instances)
+                if filtered_motif_count > 0:
+                    logger.info(
+                        f"[CallResponseLanes] Filtered out {filtered_motif_count} full-mix motif instances (USE_FULL_MIX_FOR_LANE_VIEW=False)"
+                    )
+                motif_instances = stem_only_instances
+            else:
+                motif_instances = raw_instances
+        
+        # Log summary of per-stem motifs being used
+        per_stem_motif_count = len(motif_instances) if motif_instances else 0
+        logger.info(
+            f"[CallResponseLanes] Using {per_stem_motif_count} per-stem motifs; full-mix motifs disabled (USE_FULL_MIX_FOR_LANE_VIEW=False)"
+        )
+        
+        # Build lanes
+        return build_call_response_lanes(
             reference_id=reference_id,
             regions=regions,
-            call_response_pairs=call_response_pairs,
+            call_response_pairs=pairs,
             bpm=bundle.bpm,
             motif_instances=motif_instances
         )
-        
-        return lanes_response
+    
+    try:
+        return cached_json_response(
+            REFERENCE_CALL_RESPONSE_LANES_JSON, reference_id,
+            (bundle, regions, call_response_pairs, raw_instances), build_payload,
+            if_none_match, accept_encoding
+        )
     except Exception as e:
         logger.error(f"Error building call-response lanes for reference {reference_id}: {e}", exc_info=True)
         raise HTTPException(
@@ -816,13 +793,19 @@ async def get_call_response_by_stem(reference_id: str):
         )
 
 
-@router.get("/{reference_id}/fills")
-async def get_fills(reference_id: str):
+@router.get("/{reference_id}/fills", response_model=FillsResponse)
+async def get_fills(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get detected fills for a reference bundle.
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with fill objects
@@ -830,42 +813,29 @@ async def get_fills(reference_id: str):
     logger.info(f"Getting fills for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if fills have been detected
-    if reference_id not in REFERENCE_FILLS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Fills not found for reference {reference_id}. Run /analyze first."
-        )
+    fills = _require(REFERENCE_FILLS, reference_id, f"Fills not found for reference {reference_id}. Run /analyze first.")
     
-    fills = REFERENCE_FILLS[reference_id]
-    
-    # Convert Fill dataclasses to dictionaries for JSON serialization
-    fills_dict = []
-    for fill in fills:
-        fills_dict.append({
-            "id": fill.id,
-            "time": fill.time,
-            "stemRoles": fill.stem_roles,
-            "regionId": fill.region_id,
-            "confidence": fill.confidence,
-            "fillType": fill.fill_type
-        })
+    def build_payload() -> FillsResponse:
+        return FillsResponse(
+            reference_id=reference_id,
+            fills=fills,
+            count=len(fills)
+        )
     
-    return {
-        "referenceId": reference_id,
-        "fills": fills_dict,
-        "count": len(fills_dict)
-    }
+    return cached_json_response(
+        REFERENCE_FILLS_JSON, reference_id, fills, build_payload, if_none_match, accept_encoding
+    )
 
 
-@router.get("/{reference_id}/subregions")
-async def get_subregions(reference_id: str):
+@router.get("/{reference_id}/subregions", response_model=SubRegionsResponse)
+async def get_subregions(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get computed subregion patterns for a reference bundle.
     
@@ -874,6 +844,8 @@ async def get_subregions(reference_id: str):
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with subregion data organized by region and stem category (lanes)
@@ -910,43 +882,28 @@ async def get_subregions(reference_id: str):
     logger.info(f"Getting subregions for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
-    
-    bundle = REFERENCE_BUNDLES[reference_id]
+    bundle = _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Check if regions have been detected
-    if reference_id not in REFERENCE_REGIONS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Regions not found for reference {reference_id}. Run /analyze first."
-        )
-    
-    regions = REFERENCE_REGIONS[reference_id]
+    regions = _require(REFERENCE_REGIONS, reference_id, f"Regions not found for reference {reference_id}. Run /analyze first.")
     
     # Check if motifs have been detected (needed for subregion computation)
-    if reference_id not in REFERENCE_MOTIFS:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Motifs not found for reference {reference_id}. Run /analyze first."
-        )
-    
-    # Get motifs
-    motif_instances, motif_groups = REFERENCE_MOTIFS[reference_id]
+    motif_instances, motif_groups = _require(REFERENCE_MOTIFS, reference_id, f"Motifs not found for reference {reference_id}. Run /analyze first.")
     
     # Check if subregions are already computed and cached
-    if reference_id in REFERENCE_SUBREGIONS:
+    subregions = REFERENCE_SUBREGIONS.get(reference_id)
+    if subregions is not None:
         logger.info(f"Returning cached subregions for reference {reference_id}")
-        subregions = REFERENCE_SUBREGIONS[reference_id]
     else:
         # Compute subregions using real analysis data
         logger.info(f"Computing subregions for reference {reference_id}")
         
-        # Create density curves from bundle (computes RMS envelopes per stem)
-        density_curves = DensityCurves(bundle)
+        # Density curves (RMS envelopes per stem) only depend on the bundle audio,
+        # so they are computed once per bundle and reused across recomputations
+        density_curves = REFERENCE_DENSITY_CURVES.get(reference_id)
+        if density_curves is None or density_curves.bundle is not bundle:
+            density_curves = DensityCurves(bundle)
+            REFERENCE_DENSITY_CURVES[reference_id] = density_curves
         
         # Compute subregions
         subregions = compute_region_subregions(
@@ -963,25 +920,30 @@ async def get_subregions(reference_id: str):
         REFERENCE_SUBREGIONS[reference_id] = subregions
         logger.info(f"Cached subregions for reference {reference_id}")
     
-    # Convert to DTOs for JSON serialization
-    regions_dto = []
-    for region_subregions in subregions:
-        region_dto = RegionSubRegionsDTO.model_validate(region_subregions)
-        regions_dto.append(region_dto)
+    def build_payload() -> SubRegionsResponse:
+        return SubRegionsResponse(
+            reference_id=reference_id,
+            regions=subregions
+        )
     
-    return {
-        "referenceId": reference_id,
-        "regions": [r.model_dump(by_alias=True) for r in regions_dto]
-    }
+    return cached_json_response(
+        REFERENCE_SUBREGIONS_JSON, reference_id, subregions, build_payload, if_none_match, accept_encoding
+    )
 
 
 @router.get("/{reference_id}/annotations")
-async def get_annotations(reference_id: str):
+async def get_annotations(
+    reference_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get Visual Composer annotations for a reference bundle.
     
     Args:
         reference_id: ID of the reference bundle
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with annotations data, or empty structure if none exist
@@ -1000,23 +962,22 @@ async def get_annotations(reference_id: str):
     logger.info(f"Getting annotations for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Return existing annotations or empty structure
-    if reference_id in REFERENCE_ANNOTATIONS:
-        annotations = REFERENCE_ANNOTATIONS[reference_id]
-        # Use by_alias=True to return camelCase field names
-        return annotations.model_dump(by_alias=True)
+    annotations = REFERENCE_ANNOTATIONS.get(reference_id)
+    if annotations is not None:
+        # Each POST stores a new annotations object, which invalidates the cached payload
+        return cached_json_response(
+            REFERENCE_ANNOTATIONS_JSON, reference_id, annotations, lambda: annotations,
+            if_none_match, accept_encoding
+        )
     else:
         # Return empty structure
-        return {
+        return ORJSONResponse(content={
             "referenceId": reference_id,
             "regions": []
-        }
+        })
 
 
 @router.post("/{reference_id}/annotations")
@@ -1049,11 +1010,7 @@ async def create_or_update_annotations(
     logger.info(f"Creating/updating annotations for reference_id: {reference_id}")
     
     # Check if reference exists
-    if reference_id not in REFERENCE_BUNDLES:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reference bundle {reference_id} not found"
-        )
+    _require(REFERENCE_BUNDLES, reference_id, f"Reference bundle {reference_id} not found")
     
     # Force reference_id in payload to match path parameter
     if annotations.reference_id != reference_id:
@@ -1105,4 +1062,4 @@ async def create_or_update_annotations(
     logger.info(f"Stored annotations for reference {reference_id}: {len(annotations.regions)} regions")
     
     # Use by_alias=True to return camelCase field names
-    return annotations.model_dump(by_alias=True)
+    return Response(content=annotations.model_dump_json(by_alias=True), media_type="application/json")
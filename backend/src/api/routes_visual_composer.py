@@ -1,7 +1,15 @@
 """Visual Composer API routes."""
-from fastapi import APIRouter, HTTPException, status, Body
+import logging
+from collections import defaultdict
+from typing import Annotated, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, status, Body, Header
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 from utils.logger import get_logger
 
+from api.responses import ORJSONResponse, cached_json_response
 from models.visual_composer import (
     VisualComposerAnnotations,
     VisualComposerRegionAnnotations
@@ -11,46 +19,45 @@ from models.visual_composer_repository import (
     save_annotations,
     has_annotations
 )
-from models.store import REFERENCE_BUNDLES, REFERENCE_REGIONS
+from models.store import (
+    REFERENCE_BUNDLES, REFERENCE_REGIONS, VISUAL_COMPOSER_ANNOTATIONS_JSON, MAX_VISUAL_COMPOSER_PAYLOADS,
+    get_region_ids
+)
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/visual-composer", tags=["visual-composer"])
+router = APIRouter(prefix="/visual-composer", tags=["visual-composer"], default_response_class=ORJSONResponse)
 
-
-def seconds_to_bars(seconds: float, bpm: float) -> float:
+def bars_per_second(bpm: float) -> float:
     """
-    Convert seconds to bars (assuming 4/4 time signature).
+    Get the number of bars per second of audio (assuming 4/4 time signature).
     
     Args:
-        seconds: Time in seconds
         bpm: Beats per minute
     
     Returns:
-        Time in bars
+        Bars per second
     """
-    beats_per_second = bpm / 60.0
-    beats = seconds * beats_per_second
-    bars = beats / 4.0  # 4 beats per bar in 4/4 time
-    return bars
+    return bpm / 240.0  # 60 seconds per minute * 4 beats per bar in 4/4 time
 
 
-def create_default_region_annotations(region, bpm: float, display_order: int) -> VisualComposerRegionAnnotations:
+def create_default_region_annotations(region, bars_per_sec: float, display_order: int) -> VisualComposerRegionAnnotations:
     """
     Create default region annotations from a Region model.
     
     Args:
         region: Region dataclass instance
-        bpm: Beats per minute for time-to-bar conversion
+        bars_per_sec: Time-to-bar scale from bars_per_second(bpm), computed once per request
         display_order: Display order for sorting
     
     Returns:
         VisualComposerRegionAnnotations with default values
     """
-    start_bar = seconds_to_bars(region.start, bpm)
-    end_bar = seconds_to_bars(region.end, bpm)
+    start_bar = region.start * bars_per_sec
+    end_bar = region.end * bars_per_sec
     
-    return VisualComposerRegionAnnotations(
+    # Region already guarantees 0 <= start < end, so the field validators are skipped
+    return VisualComposerRegionAnnotations.model_construct(
         regionId=region.id,
         regionName=region.name,
         notes=None,
@@ -64,7 +71,11 @@ def create_default_region_annotations(region, bpm: float, display_order: int) ->
 
 
 @router.get("/{project_id}/annotations")
-async def get_visual_composer_annotations(project_id: str):
+async def get_visual_composer_annotations(
+    project_id: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
+):
     """
     Get Visual Composer annotations for a project.
     
@@ -73,6 +84,8 @@ async def get_visual_composer_annotations(project_id: str):
     
     Args:
         project_id: ID of the project (same as reference_id)
+        if_none_match: ETag from a previous response; a match returns 304 Not Modified
+        accept_encoding: Accept-Encoding request header; gzip gets the pre-compressed payload
     
     Returns:
         JSON with annotations data, including defaults for missing regions
@@ -80,68 +93,69 @@ async def get_visual_composer_annotations(project_id: str):
     Raises:
         500 if there's an error retrieving annotations
     """
-    logger.info(f"Getting Visual Composer annotations for project_id: {project_id}")
+    logger.info("Getting Visual Composer annotations for project_id: %s", project_id)
     
     try:
         # Get existing annotations (returns None if none exist - this is expected)
-        existing_annotations = get_annotations(project_id)
+        # (off the event loop: with persistence enabled this is SQLite I/O)
+        existing_annotations = await run_in_threadpool(get_annotations, project_id)
         
         # Get known regions from the main analysis (if available)
-        known_regions = REFERENCE_REGIONS.get(project_id, [])
+        known_regions = REFERENCE_REGIONS.get(project_id, ())
         bundle = REFERENCE_BUNDLES.get(project_id)
         bpm = bundle.bpm if bundle else 120.0  # Default to 120 BPM if bundle not found
         
-        # Build a map of existing region annotations by regionId
-        existing_regions_map = {}
-        if existing_annotations:
-            for region_ann in existing_annotations.regions:
-                existing_regions_map[region_ann.regionId] = region_ann
-        
-        # Build the complete list of region annotations
-        # Start with existing annotations, then add defaults for missing regions
-        all_region_annotations = []
-        existing_region_ids = set(existing_regions_map.keys())
-        
-        # Add existing annotations first
-        for region_ann in existing_annotations.regions if existing_annotations else []:
-            all_region_annotations.append(region_ann)
-        
-        # Add default entries for known regions that don't have annotations yet
-        for display_order, region in enumerate(known_regions):
-            if region.id not in existing_region_ids:
-                logger.info(f"Creating default annotations for region {region.id} (not found in existing annotations)")
-                default_region_ann = create_default_region_annotations(region, bpm, display_order)
-                all_region_annotations.append(default_region_ann)
-        
-        # If we have known regions but no existing annotations, ensure all regions are included
-        if known_regions and not existing_annotations:
-            logger.info(f"Creating default annotations for all {len(known_regions)} known regions")
-            all_region_annotations = [
-                create_default_region_annotations(region, bpm, idx)
-                for idx, region in enumerate(known_regions)
-            ]
-        
         # If no known regions and no existing annotations, return empty structure (still 200 OK)
         # This is the expected case for a new project
         if not known_regions and not existing_annotations:
-            logger.info(f"No regions found for project {project_id}, returning empty annotations structure")
-            final_annotations = VisualComposerAnnotations(
+            logger.info("No regions found for project %s, returning empty annotations structure", project_id)
+            final_annotations = VisualComposerAnnotations.model_construct(
                 projectId=project_id,
                 regions=[]
             )
-            return final_annotations.model_dump(by_alias=True)
+            return Response(content=final_annotations.model_dump_json(by_alias=True), media_type="application/json")
         
-        # Sort by displayOrder if available, otherwise by regionId
-        all_region_annotations.sort(key=lambda r: (r.displayOrder if r.displayOrder is not None else 999, r.regionId))
+        def build_annotations() -> VisualComposerAnnotations:
+            bars_per_sec = bars_per_second(bpm)
+            
+            # Build the complete list of region annotations
+            # Start with existing annotations, then add defaults for missing regions
+            if existing_annotations:
+                all_region_annotations = list(existing_annotations.regions)
+                existing_region_ids = {region_ann.regionId for region_ann in all_region_annotations}
+            else:
+                all_region_annotations = []
+                existing_region_ids = set()
+            
+            # Add default entries for known regions that don't have annotations yet
+            # (all of them when there are no existing annotations)
+            for display_order, region in enumerate(known_regions):
+                if region.id not in existing_region_ids:
+                    logger.info(f"Creating default annotations for region {region.id} (not found in existing annotations)")
+                    default_region_ann = create_default_region_annotations(region, bars_per_sec, display_order)
+                    all_region_annotations.append(default_region_ann)
+            
+            # Sort by displayOrder if available, otherwise by regionId. Defaults alone are already in
+            # order (their displayOrder is their index in known_regions), so only a merge needs sorting
+            if existing_region_ids:
+                all_region_annotations.sort(key=lambda r: (r.displayOrder if r.displayOrder is not None else 999, r.regionId))
+            
+            # Create the final annotations structure (its regions are already model instances, so skip validation)
+            return VisualComposerAnnotations.model_construct(
+                projectId=project_id,
+                regions=all_region_annotations
+            )
         
-        # Create the final annotations structure
-        final_annotations = VisualComposerAnnotations(
-            projectId=project_id,
-            regions=all_region_annotations
+        # Encoded (and gzipped, with its own ETag) only when the saved annotations, the regions or
+        # the bundle (bpm) are replaced; each POST saves a new annotations object
+        response = cached_json_response(
+            VISUAL_COMPOSER_ANNOTATIONS_JSON, project_id, (existing_annotations, known_regions, bundle),
+            build_annotations, if_none_match, accept_encoding
         )
-        
-        # Return with camelCase field names
-        return final_annotations.model_dump(by_alias=True)
+        VISUAL_COMPOSER_ANNOTATIONS_JSON.move_to_end(project_id)
+        while len(VISUAL_COMPOSER_ANNOTATIONS_JSON) > MAX_VISUAL_COMPOSER_PAYLOADS:
+            VISUAL_COMPOSER_ANNOTATIONS_JSON.popitem(last=False)
+        return response
     
     except ValueError as ve:
         # Validation errors
@@ -177,38 +191,39 @@ def validate_annotations(annotations: VisualComposerAnnotations, project_id: str
             f"Overriding payload projectId to match path."
         )
     
-    # Get known regions for validation
-    known_regions = REFERENCE_REGIONS.get(project_id, [])
-    known_region_ids = {r.id for r in known_regions}
+    # Validate region IDs exist against the known regions, if any (log warning, don't reject)
+    known_region_ids = get_region_ids(project_id)
+    if known_region_ids:
+        for region_ann in annotations.regions:
+            if region_ann.regionId not in known_region_ids:
+                logger.warning(
+                    f"Region ID {region_ann.regionId} in annotations not found in known regions. "
+                    f"Known region IDs: {list(known_region_ids)}"
+                )
     
-    # Validate region IDs exist (log warning, don't reject)
     for region_ann in annotations.regions:
-        if known_regions and region_ann.regionId not in known_region_ids:
-            logger.warning(
-                f"Region ID {region_ann.regionId} in annotations not found in known regions. "
-                f"Known region IDs: {list(known_region_ids)}"
-            )
-        
         # Check for overlapping blocks in the same lane (log warning)
-        blocks_by_lane: dict[str, list] = {}
+        blocks_by_lane: defaultdict[str, list] = defaultdict(list)
         for block in region_ann.blocks:
-            if block.laneId not in blocks_by_lane:
-                blocks_by_lane[block.laneId] = []
             blocks_by_lane[block.laneId].append(block)
         
         for lane_id, blocks in blocks_by_lane.items():
-            # Sort blocks by startBar
-            sorted_blocks = sorted(blocks, key=lambda b: b.startBar)
-            for i in range(len(sorted_blocks) - 1):
-                current = sorted_blocks[i]
-                next_block = sorted_blocks[i + 1]
-                # Check if blocks overlap (endBar > next startBar)
-                if current.endBar > next_block.startBar:
-                    logger.warning(
-                        f"Overlapping blocks detected in region {region_ann.regionId}, lane {lane_id}: "
-                        f"block {current.id} (bars {current.startBar}-{current.endBar}) overlaps with "
-                        f"block {next_block.id} (bars {next_block.startBar}-{next_block.endBar})"
-                    )
+            if len(blocks) < 2:
+                continue
+            # Sort blocks by startBar (stable, like sorted())
+            starts = np.fromiter((b.startBar for b in blocks), dtype=np.float64, count=len(blocks))
+            ends = np.fromiter((b.endBar for b in blocks), dtype=np.float64, count=len(blocks))
+            order = np.argsort(starts, kind="stable")
+            # Blocks overlap when a block's endBar is past the next block's startBar
+            overlaps = np.nonzero(ends[order[:-1]] > starts[order[1:]])[0]
+            for i in overlaps:
+                current = blocks[order[i]]
+                next_block = blocks[order[i + 1]]
+                logger.warning(
+                    f"Overlapping blocks detected in region {region_ann.regionId}, lane {lane_id}: "
+                    f"block {current.id} (bars {current.startBar}-{current.endBar}) overlaps with "
+                    f"block {next_block.id} (bars {next_block.startBar}-{next_block.endBar})"
+                )
 
 
 @router.post("/{project_id}/annotations")
@@ -231,15 +246,16 @@ async def create_or_update_visual_composer_annotations(
         422 if Pydantic validation fails
         500 if there's an unexpected error saving annotations
     """
-    logger.info(f"Creating/updating Visual Composer annotations for project_id: {project_id}")
+    logger.info("Creating/updating Visual Composer annotations for project_id: %s", project_id)
     
     try:
         # Force project_id in payload to match path parameter
         if annotations.projectId != project_id:
-            logger.warning(
-                f"Project ID mismatch: path={project_id}, payload={annotations.projectId}. "
-                f"Overriding payload projectId to match path."
-            )
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "Project ID mismatch: path=%s, payload=%s. Overriding payload projectId to match path.",
+                    project_id, annotations.projectId
+                )
             annotations.projectId = project_id
         
         # Validate annotations (logs warnings, doesn't reject unless critical)
@@ -254,11 +270,11 @@ async def create_or_update_visual_composer_annotations(
             )
         
         # Save annotations
-        save_annotations(annotations)
-        logger.info(f"Stored annotations for project {project_id}: {len(annotations.regions)} regions")
+        await run_in_threadpool(save_annotations, annotations)
+        logger.info("Stored annotations for project %s: %d regions", project_id, len(annotations.regions))
         
         # Return stored annotations with camelCase field names
-        return annotations.model_dump(by_alias=True)
+        return Response(content=annotations.model_dump_json(by_alias=True), media_type="application/json")
     
     except HTTPException:
         # Re-raise HTTP exceptions (validation errors)
@@ -36,6 +36,33 @@ DEFAULT_FILL_MIN_TRANSIENT_DENSITY = float(os.environ.get("DEFAULT_FILL_MIN_TRAN
 DEFAULT_SUBREGION_BARS_PER_CHUNK = int(os.environ.get("DEFAULT_SUBREGION_BARS_PER_CHUNK", "2"))
 DEFAULT_SUBREGION_SILENCE_INTENSITY_THRESHOLD = float(os.environ.get("DEFAULT_SUBREGION_SILENCE_INTENSITY_THRESHOLD", "0.15"))
 
+# In-memory store limits
+# Number of reference bundles kept in memory; the least recently used one is evicted beyond this
+MAX_REFERENCES = int(os.environ.get("MAX_REFERENCES", "8"))
+# Seconds a reference may sit unused before it is evicted; 0 keeps references until LRU eviction
+REFERENCE_TTL_SECONDS = float(os.environ.get("REFERENCE_TTL_SECONDS", "0"))
+
+# Analysis execution
+# Worker processes for the CPU-bound detect_* stages; 0 runs them in threads inside the API process
+# (each call ships the bundle audio to the worker, so processes pay off mainly for concurrent analyses)
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "0"))
+
+# Upload staging
+# Directory uploaded stems are written to before loading; each upload's directory is removed once its bundle
+# is loaded. Set REF_TMPDIR=/dev/shm/reference to stage in RAM on hosts with a large enough /dev/shm
+# (Docker gives containers 64 MB by default, too small for a multi-stem WAV upload)
+REFERENCE_TMPDIR = os.environ.get("REF_TMPDIR") or "tmp/reference"
+# Staged upload directories left behind (e.g. by a crash mid-upload) are removed after this many seconds; 0 keeps them
+UPLOAD_STAGING_MAX_AGE_SECONDS = float(os.environ.get("UPLOAD_STAGING_MAX_AGE_SECONDS", "3600"))
+# How often the staging cleanup task runs
+UPLOAD_STAGING_CLEANUP_INTERVAL_SECONDS = float(os.environ.get("UPLOAD_STAGING_CLEANUP_INTERVAL_SECONDS", "300"))
+
+# Visual Composer annotations persistence
+# SQLite database file for annotations (shared by all workers); empty keeps them in process memory only
+VISUAL_COMPOSER_DB_PATH = os.environ.get("VISUAL_COMPOSER_DB_PATH", "")
+# Annotations kept in each worker's in-memory front cache when persisted to the database
+VISUAL_COMPOSER_CACHE_SIZE = int(os.environ.get("VISUAL_COMPOSER_CACHE_SIZE", "64"))
+
 # Region Map stem lanes configuration
 # NOTE: The Region Map stem lanes are intended to be per-stem only; full-mix motifs are ignored here by design.
 USE_FULL_MIX_FOR_LANE_VIEW = os.environ.get("USE_FULL_MIX_FOR_LANE_VIEW", "false").lower() == "true"
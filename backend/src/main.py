@@ -1,12 +1,46 @@
 """Main FastAPI application entry point."""
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from config import APP_NAME
-from api.routes_reference import router as reference_router
+from config import APP_NAME, UPLOAD_STAGING_MAX_AGE_SECONDS, UPLOAD_STAGING_CLEANUP_INTERVAL_SECONDS
+from api.analysis_pool import shutdown_analysis_pool
+from api.multipart_upload import remove_stale_upload_dirs
+from api.responses import ORJSONResponse, GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+from api.routes_reference import router as reference_router, TEMP_DIR
 from api.routes_visual_composer import router as visual_composer_router
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def _clean_upload_staging() -> None:
+    """Periodically remove stale upload directories from the staging area."""
+    while True:
+        await asyncio.sleep(UPLOAD_STAGING_CLEANUP_INTERVAL_SECONDS)
+        try:
+            removed = await asyncio.to_thread(remove_stale_upload_dirs, TEMP_DIR, UPLOAD_STAGING_MAX_AGE_SECONDS)
+        except OSError as e:
+            logger.warning(f"Upload staging cleanup failed: {e}")
+            continue
+        if removed:
+            logger.info(f"Removed {removed} stale upload director{'y' if removed == 1 else 'ies'} from {TEMP_DIR}")
 
-app = FastAPI(title=APP_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the upload staging cleanup and release the analysis worker processes on shutdown."""
+    cleanup = asyncio.create_task(_clean_upload_staging()) if UPLOAD_STAGING_MAX_AGE_SECONDS > 0 else None
+    yield
+    if cleanup is not None:
+        cleanup.cancel()
+    shutdown_analysis_pool()
+
+
+app = FastAPI(title=APP_NAME, default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configure CORS for localhost frontend
 app.add_middleware(
@@ -17,6 +51,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (cached reference payloads arrive pre-compressed and are passed through)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
 # Include routers
 app.include_router(reference_router, prefix="/api")
 app.include_router(visual_composer_router, prefix="/api")
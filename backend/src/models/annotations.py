@@ -1,11 +1,6 @@
 """Pydantic models for Visual Composer annotations."""
-from typing import List, Optional
-try:
-    from typing import Literal
-except ImportError:
-    # Python < 3.8
-    from typing_extensions import Literal
-from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 
 
 class AnnotationBlock(BaseModel):
@@ -28,14 +23,12 @@ class AnnotationBlock(BaseModel):
     class Config:
         populate_by_name = True  # Allow both field names and aliases
     
-    @field_validator('end_bar')
-    @classmethod
-    def validate_end_bar(cls, v: float, info) -> float:
+    @model_validator(mode='after')
+    def validate_end_bar(self) -> "AnnotationBlock":
         """Ensure end_bar is greater than start_bar."""
-        start_bar = info.data.get('start_bar') or info.data.get('startBar')
-        if start_bar is not None and v <= start_bar:
-            raise ValueError(f"end_bar must be greater than start_bar, got start={start_bar}, end={v}")
-        return v
+        if self.end_bar <= self.start_bar:
+            raise ValueError(f"end_bar must be greater than start_bar, got start={self.start_bar}, end={self.end_bar}")
+        return self
 
 
 class AnnotationLane(BaseModel):
@@ -51,22 +44,15 @@ class AnnotationLane(BaseModel):
     order: Optional[int] = Field(None, ge=0, description="Display order of the lane")
     
     # Backward compatibility: accept old format
-    stem_category: Optional[str] = Field(None, alias="stemCategory", description="Legacy: stem category (deprecated)")
+    stem_category: Optional[Literal['drums', 'bass', 'vocals', 'instruments']] = Field(
+        None,
+        alias="stemCategory",
+        description="Legacy: stem category (deprecated)"
+    )
     blocks: Optional[List[AnnotationBlock]] = Field(None, description="Legacy: blocks in lane (deprecated, use region-level blocks)")
     
     class Config:
         populate_by_name = True  # Allow both field names and aliases
-    
-    @field_validator('stem_category')
-    @classmethod
-    def validate_stem_category(cls, v: Optional[str]) -> Optional[str]:
-        """Validate stem category if provided (for backward compatibility)."""
-        if v is None:
-            return v
-        allowed = {"drums", "bass", "vocals", "instruments"}
-        if v not in allowed:
-            raise ValueError(f"stem_category must be one of {allowed}, got {v}")
-        return v
 
 
 class RegionAnnotations(BaseModel):
@@ -10,6 +10,10 @@ if TYPE_CHECKING:
 class ReferenceBundle:
     """Container for reference track stems and metadata."""
     
+    __slots__ = (
+        "drums", "bass", "vocals", "instruments", "full_mix", "bpm", "key", "motif_sensitivity_config"
+    )
+    
     def __init__(
         self,
         drums: AudioFile,
@@ -60,27 +64,49 @@ class ReferenceBundle:
         Raises:
             ValueError: If any file durations differ by more than tolerance
         """
-        durations = {
-            'drums': self.drums.duration,
-            'bass': self.bass.duration,
-            'vocals': self.vocals.duration,
-            'instruments': self.instruments.duration,
-            'full_mix': self.full_mix.duration,
-        }
+        files = (
+            ('drums', self.drums),
+            ('bass', self.bass),
+            ('vocals', self.vocals),
+            ('instruments', self.instruments),
+            ('full_mix', self.full_mix),
+        )
         
-        # Find min and max durations
-        min_duration = min(durations.values())
-        max_duration = max(durations.values())
+        # Find min and max durations in one pass
+        min_duration = max_duration = self.drums.duration
+        for _, audio in files[1:]:
+            duration = audio.duration
+            if duration < min_duration:
+                min_duration = duration
+            elif duration > max_duration:
+                max_duration = duration
         duration_diff = max_duration - min_duration
         
         if duration_diff > tolerance:
             # Build detailed error message
-            duration_str = ", ".join([f"{role}: {dur:.3f}s" for role, dur in durations.items()])
+            duration_str = ", ".join([f"{role}: {audio.duration:.3f}s" for role, audio in files])
             raise ValueError(
                 f"Audio file durations differ by {duration_diff:.3f}s (tolerance: {tolerance}s). "
                 f"Durations: {duration_str}"
             )
     
+    def copy(self) -> "ReferenceBundle":
+        """
+        Create a new bundle sharing this bundle's audio files and metadata.
+        
+        The audio arrays are not copied; the motif sensitivity config is.
+        """
+        return ReferenceBundle(
+            drums=self.drums,
+            bass=self.bass,
+            vocals=self.vocals,
+            instruments=self.instruments,
+            full_mix=self.full_mix,
+            bpm=self.bpm,
+            key=self.key,
+            motif_sensitivity_config=self.motif_sensitivity_config
+        )
+    
     def get_all_stems(self) -> List[AudioFile]:
         """Get all stem audio files (excluding full_mix)."""
         return [self.drums, self.bass, self.vocals, self.instruments]
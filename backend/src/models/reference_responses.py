@@ -0,0 +1,161 @@
+"""
+Pydantic response models for reference analysis API routes.
+
+camelCase names are serialization aliases only, so validating from the analysis
+dataclasses reads their snake_case attributes without a failed alias lookup first.
+"""
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from analysis.subregions.models import RegionSubRegionsDTO
+
+
+class RegionOut(BaseModel):
+    """Pydantic model for Region API response."""
+    id: str
+    name: str
+    type: str
+    start: float
+    end: float
+    duration: float
+    motifs: List[str]
+    fills: List[str]
+    call_response: List[Dict[str, Any]] = Field(..., alias="callResponse")
+
+    class Config:
+        populate_by_name = True  # Allow both field names and aliases
+        from_attributes = True  # Allow creation from dataclass instances
+
+
+class MotifInstanceOut(BaseModel):
+    """Pydantic model for MotifInstance API response (features are omitted)."""
+    id: str
+    stem_role: str = Field(..., serialization_alias="stemRole")
+    start_time: float = Field(..., serialization_alias="startTime")
+    end_time: float = Field(..., serialization_alias="endTime")
+    duration: float
+    group_id: Optional[str] = Field(None, serialization_alias="groupId")
+    is_variation: bool = Field(..., serialization_alias="isVariation")
+    region_ids: List[str] = Field(..., serialization_alias="regionIds")
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
+class MotifGroupOut(BaseModel):
+    """Pydantic model for MotifGroup API response."""
+    id: str
+    label: Optional[str] = None
+    member_ids: List[str] = Field(..., serialization_alias="memberIds")
+    member_count: int = Field(..., serialization_alias="memberCount")
+    variation_count: int = Field(..., serialization_alias="variationCount")
+
+    class Config:
+        populate_by_name = True
+
+    @classmethod
+    def from_group(cls, group) -> "MotifGroupOut":
+        """Build from a MotifGroup, summarizing its members."""
+        return cls(
+            id=group.id,
+            label=group.label,
+            member_ids=[m.id for m in group.members],
+            member_count=len(group.members),
+            variation_count=len(group.variations)
+        )
+
+
+class CallResponseOut(BaseModel):
+    """Pydantic model for CallResponsePair API response."""
+    id: str
+    from_motif_id: str = Field(..., serialization_alias="fromMotifId")
+    to_motif_id: str = Field(..., serialization_alias="toMotifId")
+    from_stem_role: str = Field(..., serialization_alias="fromStemRole")
+    to_stem_role: str = Field(..., serialization_alias="toStemRole")
+    from_time: float = Field(..., serialization_alias="fromTime")
+    to_time: float = Field(..., serialization_alias="toTime")
+    time_offset: float = Field(..., serialization_alias="timeOffset")
+    confidence: float
+    region_id: Optional[str] = Field(None, serialization_alias="regionId")
+    is_inter_stem: bool = Field(..., serialization_alias="isInterStem")
+    is_intra_stem: bool = Field(..., serialization_alias="isIntraStem")
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
+class FillOut(BaseModel):
+    """Pydantic model for Fill API response."""
+    id: str
+    time: float
+    stem_roles: List[str] = Field(..., serialization_alias="stemRoles")
+    region_id: str = Field(..., serialization_alias="regionId")
+    confidence: float
+    fill_type: Optional[str] = Field(None, serialization_alias="fillType")
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
+class RegionsResponse(BaseModel):
+    """Response for GET /reference/{id}/regions."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    regions: List[RegionOut]
+    count: int
+
+    class Config:
+        populate_by_name = True
+
+
+class MotifsResponse(BaseModel):
+    """Response for GET /reference/{id}/motifs."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    instances: List[MotifInstanceOut]
+    groups: List[MotifGroupOut]
+    instance_count: int = Field(..., serialization_alias="instanceCount")
+    group_count: int = Field(..., serialization_alias="groupCount")
+
+    class Config:
+        populate_by_name = True
+
+
+class CallResponseResponse(BaseModel):
+    """Response for GET /reference/{id}/call-response."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    pairs: List[CallResponseOut]
+    count: int
+
+    class Config:
+        populate_by_name = True
+
+
+class FillsResponse(BaseModel):
+    """Response for GET /reference/{id}/fills."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    fills: List[FillOut]
+    count: int
+
+    class Config:
+        populate_by_name = True
+
+
+class MotifSensitivityResponse(BaseModel):
+    """Response for GET /reference/{id}/motif-sensitivity."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    motif_sensitivity_config: Dict[str, float] = Field(..., serialization_alias="motifSensitivityConfig")
+
+    class Config:
+        populate_by_name = True
+
+
+class SubRegionsResponse(BaseModel):
+    """Response for GET /reference/{id}/subregions."""
+    reference_id: str = Field(..., serialization_alias="referenceId")
+    regions: List[RegionSubRegionsDTO]
+
+    class Config:
+        populate_by_name = True
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Region:
     """Represents a region (section) of a song."""
     id: str
@@ -1,25 +1,105 @@
 """In-memory store for reference bundles and regions."""
-from typing import Dict, List, TYPE_CHECKING
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, TYPE_CHECKING
 
+from config import MAX_REFERENCES, REFERENCE_TTL_SECONDS
 from models.reference_bundle import ReferenceBundle
 from models.region import Region
 
 if TYPE_CHECKING:
     from models.annotations import ReferenceAnnotations
+    from analysis.subregions.service import DensityCurves
+    from analysis.motif_detector.motif_detector import RawMotifInstances
+
+
+class ReferenceBundleStore(OrderedDict):
+    """
+    LRU-ordered mapping of reference_id -> ReferenceBundle.
+    
+    Reads mark a reference as recently used. Storing a new reference beyond
+    max_references evicts the least recently used one along with every
+    analysis result stored for it. With ttl_seconds > 0, references not read
+    or stored for that long are evicted the same way on the next access.
+    
+    A reference whose analysis lock is held is never evicted (the store may
+    briefly exceed max_references instead), so a running analysis never
+    writes results for a bundle that is already gone.
+    """
+    
+    def __init__(self, max_references: int, ttl_seconds: float = 0.0):
+        super().__init__()
+        self.max_references = max_references
+        self.ttl_seconds = ttl_seconds
+        self._last_used: Dict[str, float] = {}
+    
+    def _touch(self, reference_id: str) -> None:
+        self.move_to_end(reference_id)
+        self._last_used[reference_id] = time.monotonic()
+    
+    @staticmethod
+    def _is_busy(reference_id: str) -> bool:
+        lock = REFERENCE_LOCKS.get(reference_id)
+        return lock is not None and lock.locked()
+    
+    def _evict(self, reference_id: str) -> None:
+        super().pop(reference_id, None)
+        self._last_used.pop(reference_id, None)
+        evict_reference(reference_id)
+    
+    def expire(self) -> None:
+        """Evict references idle for longer than ttl_seconds."""
+        if self.ttl_seconds <= 0:
+            return
+        deadline = time.monotonic() - self.ttl_seconds
+        # Entries are in LRU order, so idle ones are at the front
+        for reference_id in list(self):
+            if self._last_used.get(reference_id, deadline) >= deadline:
+                break
+            if not self._is_busy(reference_id):
+                self._evict(reference_id)
+    
+    def __getitem__(self, reference_id: str) -> ReferenceBundle:
+        self.expire()
+        bundle = super().__getitem__(reference_id)
+        self._touch(reference_id)
+        return bundle
+    
+    def get(self, reference_id: str, default=None):
+        self.expire()
+        if reference_id in self:
+            return self[reference_id]
+        return default
+    
+    def __setitem__(self, reference_id: str, bundle: ReferenceBundle) -> None:
+        self.expire()
+        super().__setitem__(reference_id, bundle)
+        self._touch(reference_id)
+        excess = len(self) - self.max_references
+        if excess > 0:
+            idle = [ref_id for ref_id in self if ref_id != reference_id and not self._is_busy(ref_id)]
+            for ref_id in idle[:excess]:
+                self._evict(ref_id)
+
 
 # In-memory storage for reference bundles
-REFERENCE_BUNDLES: Dict[str, ReferenceBundle] = {}
+REFERENCE_BUNDLES: Dict[str, ReferenceBundle] = ReferenceBundleStore(MAX_REFERENCES, REFERENCE_TTL_SECONDS)
 
 # In-memory storage for detected regions per reference
 REFERENCE_REGIONS: Dict[str, List[Region]] = {}
 
+# Ids of the detected regions per reference, derived from REFERENCE_REGIONS by get_region_ids
+# Maps reference_id -> (regions list the ids were taken from, frozenset of region ids)
+REFERENCE_REGION_IDS: Dict[str, Tuple[List[Region], FrozenSet[str]]] = {}
+
 # In-memory storage for detected motifs per reference
 # Maps reference_id -> (instances, groups)
 REFERENCE_MOTIFS: Dict[str, tuple] = {}
 
 # In-memory storage for raw motif instances (before clustering) per reference
-# Maps reference_id -> list[MotifInstance] (raw instances with features but no group_id)
-REFERENCE_MOTIF_INSTANCES_RAW: Dict[str, List] = {}
+# Maps reference_id -> RawMotifInstances (struct-of-arrays with features but no group_id)
+REFERENCE_MOTIF_INSTANCES_RAW: Dict[str, "RawMotifInstances"] = {}
 
 # In-memory storage for detected call-response pairs per reference
 REFERENCE_CALL_RESPONSE: Dict[str, List] = {}
@@ -31,7 +111,82 @@ REFERENCE_FILLS: Dict[str, List] = {}
 # Maps reference_id -> list[RegionSubRegions]
 REFERENCE_SUBREGIONS: Dict[str, List] = {}
 
+# In-memory storage for per-stem RMS density curves per reference
+# Maps reference_id -> DensityCurves (depends only on the bundle audio)
+REFERENCE_DENSITY_CURVES: Dict[str, "DensityCurves"] = {}
+
 # In-memory storage for Visual Composer annotations per reference
 # Maps reference_id -> ReferenceAnnotations
 REFERENCE_ANNOTATIONS: Dict[str, "ReferenceAnnotations"] = {}
 
+
+# Serialized JSON payloads for the GET endpoints, keyed by reference_id.
+# Maps reference_id -> (source, payload, etag, gzipped) where source is the stored analysis
+# result (or tuple of results) the payload was built from; a payload is only served while its
+# source is unchanged.
+# gzipped is the gzip-compressed payload, or None for payloads too small to compress.
+REFERENCE_REGIONS_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_MOTIFS_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_CALL_RESPONSE_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_CALL_RESPONSE_LANES_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_FILLS_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_SUBREGIONS_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_MOTIF_SENSITIVITY_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+REFERENCE_ANNOTATIONS_JSON: Dict[str, Tuple[Any, bytes, str, Optional[bytes]]] = {}
+
+# Encoded Visual Composer GET /annotations payloads per project, least recently used first.
+# Same entry layout as the REFERENCE_*_JSON stores; the source is (saved annotations, known regions, bundle).
+# Bounded because a project needs no bundle, so evict_reference alone would not clear every entry.
+VISUAL_COMPOSER_ANNOTATIONS_JSON: "OrderedDict[str, Tuple[Any, bytes, str, Optional[bytes]]]" = OrderedDict()
+MAX_VISUAL_COMPOSER_PAYLOADS = MAX_REFERENCES
+
+# Serialized /motifs payloads re-clustered at an explicit sensitivity, per reference.
+# Maps reference_id -> {(sensitivity rounded to 4 places,): (source, payload, etag, gzipped)}, least recently used first
+REFERENCE_MOTIFS_RECLUSTERED_JSON: Dict[str, "OrderedDict[Tuple[float, ...], Tuple[Any, bytes, str, Optional[bytes]]]"] = {}
+MAX_RECLUSTERED_PAYLOADS = 16  # Per reference; the least recently used sensitivity is dropped beyond this
+
+
+# Per-reference locks serializing analysis runs that rewrite a reference's results
+REFERENCE_LOCKS: Dict[str, asyncio.Lock] = {}
+
+
+def get_reference_lock(reference_id: str) -> asyncio.Lock:
+    """Get (creating on first use) the analysis lock for a reference."""
+    lock = REFERENCE_LOCKS.get(reference_id)
+    if lock is None:
+        lock = REFERENCE_LOCKS[reference_id] = asyncio.Lock()
+    return lock
+
+
+def get_region_ids(reference_id: str) -> FrozenSet[str]:
+    """Get the ids of a reference's detected regions (empty if none), rebuilt only when its regions are replaced."""
+    regions = REFERENCE_REGIONS.get(reference_id)
+    if not regions:
+        return frozenset()
+    cached = REFERENCE_REGION_IDS.get(reference_id)
+    if cached is None or cached[0] is not regions:
+        cached = REFERENCE_REGION_IDS[reference_id] = (regions, frozenset(r.id for r in regions))
+    return cached[1]
+
+
+def evict_reference(reference_id: str) -> None:
+    """
+    Drop everything stored for a reference except the bundle itself.
+    
+    Annotations go too: the annotation routes require the bundle, so they could never be read
+    again. The analysis lock is only dropped when it is not held, so a running analysis keeps
+    the lock later callers would wait on.
+    """
+    for store in (
+        REFERENCE_REGIONS, REFERENCE_REGION_IDS, REFERENCE_MOTIFS, REFERENCE_MOTIF_INSTANCES_RAW,
+        REFERENCE_CALL_RESPONSE, REFERENCE_FILLS, REFERENCE_SUBREGIONS,
+        REFERENCE_DENSITY_CURVES,
+        REFERENCE_REGIONS_JSON, REFERENCE_MOTIFS_JSON, REFERENCE_CALL_RESPONSE_JSON,
+        REFERENCE_CALL_RESPONSE_LANES_JSON, REFERENCE_FILLS_JSON, REFERENCE_SUBREGIONS_JSON,
+        REFERENCE_MOTIFS_RECLUSTERED_JSON, REFERENCE_MOTIF_SENSITIVITY_JSON, REFERENCE_ANNOTATIONS_JSON,
+        VISUAL_COMPOSER_ANNOTATIONS_JSON, REFERENCE_ANNOTATIONS
+    ):
+        store.pop(reference_id, None)
+    lock = REFERENCE_LOCKS.get(reference_id)
+    if lock is not None and not lock.locked():
+        del REFERENCE_LOCKS[reference_id]
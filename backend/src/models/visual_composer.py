@@ -1,11 +1,7 @@
 """Pydantic models for Visual Composer annotations (per project + region)."""
-from typing import List, Optional
-try:
-    from typing import Literal
-except ImportError:
-    # Python < 3.8
-    from typing_extensions import Literal
-from pydantic import BaseModel, Field, field_validator
+import sys
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 
 
 class VisualComposerLane(BaseModel):
@@ -42,14 +38,12 @@ class VisualComposerBlock(BaseModel):
     class Config:
         populate_by_name = True  # Allow both field names and aliases
     
-    @field_validator('endBar')
-    @classmethod
-    def validate_end_bar(cls, v: float, info) -> float:
+    @model_validator(mode='after')
+    def validate_end_bar(self) -> "VisualComposerBlock":
         """Ensure endBar is greater than startBar."""
-        start_bar = info.data.get('startBar')
-        if start_bar is not None and v <= start_bar:
-            raise ValueError(f"endBar must be greater than startBar, got start={start_bar}, end={v}")
-        return v
+        if self.endBar <= self.startBar:
+            raise ValueError(f"endBar must be greater than startBar, got start={self.startBar}, end={self.endBar}")
+        return self
 
 
 class VisualComposerRegionAnnotations(BaseModel):
@@ -71,16 +65,12 @@ class VisualComposerRegionAnnotations(BaseModel):
     class Config:
         populate_by_name = True  # Allow both field names and aliases
     
-    @field_validator('endBar')
-    @classmethod
-    def validate_end_bar(cls, v: Optional[float], info) -> Optional[float]:
+    @model_validator(mode='after')
+    def validate_end_bar(self) -> "VisualComposerRegionAnnotations":
         """Ensure endBar is greater than startBar if both are provided."""
-        if v is None:
-            return v
-        start_bar = info.data.get('startBar')
-        if start_bar is not None and v <= start_bar:
-            raise ValueError(f"endBar must be greater than startBar, got start={start_bar}, end={v}")
-        return v
+        if self.startBar is not None and self.endBar is not None and self.endBar <= self.startBar:
+            raise ValueError(f"endBar must be greater than startBar, got start={self.startBar}, end={self.endBar}")
+        return self
 
 
 class VisualComposerAnnotations(BaseModel):
@@ -96,4 +86,16 @@ class VisualComposerAnnotations(BaseModel):
     
     class Config:
         populate_by_name = True  # Allow both field names and aliases
+    
+    @model_validator(mode='after')
+    def intern_block_strings(self) -> "VisualComposerAnnotations":
+        """Share lane id and color strings, which repeat across a region's lanes and blocks."""
+        for region in self.regions:
+            for lane in region.lanes:
+                lane.id = sys.intern(lane.id)
+            for block in region.blocks:
+                block.laneId = sys.intern(block.laneId)
+                if block.color is not None:
+                    block.color = sys.intern(block.color)
+        return self
 
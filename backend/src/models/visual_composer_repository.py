@@ -2,8 +2,20 @@
 
 This module abstracts read/write operations for Visual Composer annotations,
 allowing the storage implementation to be changed later without affecting the API layer.
+
+By default annotations live in process memory only. With VISUAL_COMPOSER_DB_PATH set they
+are persisted to a SQLite database (WAL mode, so several workers can share it), and the
+in-process dict becomes a bounded front cache that is revalidated against the stored version.
+
+These functions block (SQLite I/O and a module lock), so async callers should run them in a
+worker thread.
 """
-from typing import Dict, Optional
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import VISUAL_COMPOSER_DB_PATH, VISUAL_COMPOSER_CACHE_SIZE
 from models.visual_composer import VisualComposerAnnotations
 
 
@@ -11,6 +23,42 @@ from models.visual_composer import VisualComposerAnnotations
 # Maps project_id -> VisualComposerAnnotations
 _VISUAL_COMPOSER_ANNOTATIONS: Dict[str, VisualComposerAnnotations] = {}
 
+# Front cache used when annotations are persisted to SQLite
+# Maps project_id -> (stored version, VisualComposerAnnotations), least recently used first
+_CACHE: "OrderedDict[str, Tuple[int, VisualComposerAnnotations]]" = OrderedDict()
+
+_CONNECTION: Optional[sqlite3.Connection] = None
+_LOCK = threading.Lock()
+
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """Get (opening on first use) the annotations database, or None if persistence is disabled."""
+    global _CONNECTION
+    if not VISUAL_COMPOSER_DB_PATH:
+        return None
+    if _CONNECTION is None:
+        # save_annotations uses UPSERT (INSERT ... ON CONFLICT DO UPDATE)
+        if sqlite3.sqlite_version_info < (3, 24, 0):
+            raise RuntimeError(
+                f"VISUAL_COMPOSER_DB_PATH needs SQLite >= 3.24, found {sqlite3.sqlite_version}"
+            )
+        connection = sqlite3.connect(VISUAL_COMPOSER_DB_PATH, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS visual_composer_annotations ("
+            "project_id TEXT PRIMARY KEY, payload TEXT NOT NULL, version INTEGER NOT NULL)"
+        )
+        _CONNECTION = connection
+    return _CONNECTION
+
+
+def _cache_put(project_id: str, version: int, annotations: VisualComposerAnnotations) -> None:
+    """Store annotations in the front cache, dropping the least recently used beyond its size."""
+    _CACHE[project_id] = (version, annotations)
+    _CACHE.move_to_end(project_id)
+    while len(_CACHE) > VISUAL_COMPOSER_CACHE_SIZE:
+        _CACHE.popitem(last=False)
+
 
 def get_annotations(project_id: str) -> Optional[VisualComposerAnnotations]:
     """
@@ -18,11 +66,34 @@ def get_annotations(project_id: str) -> Optional[VisualComposerAnnotations]:
     
     Args:
         project_id: ID of the project
-        
+    
     Returns:
         VisualComposerAnnotations if found, None otherwise
     """
-    return _VISUAL_COMPOSER_ANNOTATIONS.get(project_id)
+    connection = _get_connection()
+    if connection is None:
+        return _VISUAL_COMPOSER_ANNOTATIONS.get(project_id)
+    
+    with _LOCK:
+        row = connection.execute(
+            "SELECT version FROM visual_composer_annotations WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            _CACHE.pop(project_id, None)
+            return None
+        cached = _CACHE.get(project_id)
+        if cached is not None and cached[0] == row[0]:
+            _CACHE.move_to_end(project_id)
+            return cached[1]
+        # Saved by another worker (or evicted from the cache): load the stored payload
+        row = connection.execute(
+            "SELECT version, payload FROM visual_composer_annotations WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        annotations = VisualComposerAnnotations.model_validate_json(row[1])
+        _cache_put(project_id, row[0], annotations)
+        return annotations
 
 
 def save_annotations(annotations: VisualComposerAnnotations) -> None:
@@ -32,7 +103,30 @@ def save_annotations(annotations: VisualComposerAnnotations) -> None:
     Args:
         annotations: VisualComposerAnnotations to save
     """
-    _VISUAL_COMPOSER_ANNOTATIONS[annotations.projectId] = annotations
+    connection = _get_connection()
+    if connection is None:
+        _VISUAL_COMPOSER_ANNOTATIONS[annotations.projectId] = annotations
+        return
+    
+    payload = annotations.model_dump_json(by_alias=True)
+    with _LOCK:
+        # Upsert and read the new version back in one write transaction, so another worker
+        # can't save in between (UPSERT ... RETURNING would need SQLite >= 3.35)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO visual_composer_annotations (project_id, payload, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(project_id) DO UPDATE SET payload = excluded.payload, version = version + 1",
+                (annotations.projectId, payload)
+            )
+            version = connection.execute(
+                "SELECT version FROM visual_composer_annotations WHERE project_id = ?", (annotations.projectId,)
+            ).fetchone()[0]
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        _cache_put(annotations.projectId, version, annotations)
 
 
 def delete_annotations(project_id: str) -> bool:
@@ -41,14 +135,23 @@ def delete_annotations(project_id: str) -> bool:
     
     Args:
         project_id: ID of the project
-        
+    
     Returns:
         True if annotations were deleted, False if they didn't exist
     """
-    if project_id in _VISUAL_COMPOSER_ANNOTATIONS:
-        del _VISUAL_COMPOSER_ANNOTATIONS[project_id]
-        return True
-    return False
+    connection = _get_connection()
+    if connection is None:
+        if project_id in _VISUAL_COMPOSER_ANNOTATIONS:
+            del _VISUAL_COMPOSER_ANNOTATIONS[project_id]
+            return True
+        return False
+    
+    with _LOCK:
+        _CACHE.pop(project_id, None)
+        cursor = connection.execute(
+            "DELETE FROM visual_composer_annotations WHERE project_id = ?", (project_id,)
+        )
+        return cursor.rowcount > 0
 
 
 def has_annotations(project_id: str) -> bool:
@@ -57,9 +160,16 @@ def has_annotations(project_id: str) -> bool:
     
     Args:
         project_id: ID of the project
-        
+    
     Returns:
         True if annotations exist, False otherwise
     """
-    return project_id in _VISUAL_COMPOSER_ANNOTATIONS
-
+    connection = _get_connection()
+    if connection is None:
+        return project_id in _VISUAL_COMPOSER_ANNOTATIONS
+    
+    with _LOCK:
+        row = connection.execute(
+            "SELECT 1 FROM visual_composer_annotations WHERE project_id = ?", (project_id,)
+        ).fetchone()
+    return row is not None
@@ -1,17 +1,12 @@
 """Audio file loading and validation."""
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Union
+from typing import Literal, Optional, Union
 
-try:
-    from typing import Literal
-except ImportError:
-    # Python < 3.8 compatibility
-    from typing_extensions import Literal
-
-import librosa
 import numpy as np
 import soundfile as sf
+import soxr
 
 from utils.logger import get_logger
 
@@ -22,29 +17,98 @@ logger = get_logger(__name__)
 AudioRole = Union[Literal["drums"], Literal["bass"], Literal["vocals"], Literal["instruments"], Literal["full_mix"]]
 
 
+# File suffixes load_audio_file accepts
+SUPPORTED_SUFFIXES = (".wav", ".aiff", ".aif")
+
+# Number of leading bytes is_supported_audio_header needs
+AUDIO_HEADER_SIZE = 12
+
+# Frames decoded per block when de-interleaving multi-channel audio
+READ_BLOCK_FRAMES = 1 << 16
+
+
 class UnsupportedFormatError(Exception):
     """Raised when audio file format is not supported."""
     pass
 
 
-@dataclass
+def is_supported_audio_header(header: bytes) -> bool:
+    """Check the container magic of a WAV (RIFF/RF64) or AIFF/AIFC file header."""
+    chunk_id, form_type = header[:4], header[8:12]
+    if chunk_id in (b"RIFF", b"RF64"):
+        return form_type == b"WAVE"
+    return chunk_id == b"FORM" and form_type in (b"AIFF", b"AIFC")
+
+
+@dataclass(slots=True)
 class AudioFile:
-    """Represents a loaded audio file with metadata."""
+    """
+    Represents a loaded audio file with metadata.
+    
+    Not frozen: the mono mixdown and BPM are cached on the instance after construction.
+    """
     path: Path
     role: str
     sr: int
     duration: float
     channels: int
     samples: np.ndarray
+    _mono: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # Snapped BPM, set by estimate_bpm on first use
+    _bpm: Optional[float] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        """Validate audio file data after initialization."""
+        """Validate audio file data after initialization (constant-time checks only)."""
         if self.samples is None or self.samples.size == 0:
             raise ValueError(f"Audio file {self.path} has no samples")
         if self.duration <= 0:
             raise ValueError(f"Audio file {self.path} has invalid duration: {self.duration}")
         if self.sr <= 0:
             raise ValueError(f"Audio file {self.path} has invalid sample rate: {self.sr}")
+        sample_channels = 1 if self.samples.ndim == 1 else self.samples.shape[0]
+        if self.samples.ndim > 2 or sample_channels != self.channels:
+            raise ValueError(
+                f"Audio file {self.path} has samples of shape {self.samples.shape} "
+                f"for {self.channels} channel(s)"
+            )
+
+    @property
+    def mono(self) -> np.ndarray:
+        """Mono mixdown of the samples (float32, computed once and shared by all analyzers)."""
+        if self.samples.ndim == 1:
+            return self.samples
+        if self._mono is None:
+            # Sum in float32 and scale in place: one output buffer, no float64 temporary
+            mono = np.add.reduce(self.samples, axis=0, dtype=np.float32)
+            mono *= np.float32(1.0 / self.samples.shape[0])
+            self._mono = mono
+        return self._mono
+
+
+def _read_channels_first(f: sf.SoundFile) -> np.ndarray:
+    """
+    Decode a multi-channel file straight into a (channels, frames) float32 array.
+    
+    soundfile yields interleaved (frames, channels) data; de-interleaving it block by
+    block avoids holding a second full-length copy just to transpose it.
+    
+    Args:
+        f: Open SoundFile positioned at the first frame
+    
+    Returns:
+        C-contiguous float32 array of shape (channels, frames)
+    """
+    samples = np.empty((f.channels, f.frames), dtype=np.float32)
+    block = np.empty((READ_BLOCK_FRAMES, f.channels), dtype=np.float32)
+    position = 0
+    while position < f.frames:
+        frames_read = f.read(out=block)
+        if len(frames_read) == 0:
+            break
+        samples[:, position:position + len(frames_read)] = frames_read.T
+        position += len(frames_read)
+    # Some headers overstate the frame count; drop the tail that was never filled
+    return samples[:, :position].copy() if position < f.frames else samples
 
 
 def load_audio_file(
@@ -74,62 +138,48 @@ def load_audio_file(
     
     # Validate file format
     suffix = path.suffix.lower()
-    if suffix not in ['.wav', '.aiff', '.aif']:
+    if suffix not in SUPPORTED_SUFFIXES:
         raise UnsupportedFormatError(
             f"Unsupported audio format: {suffix}. Only WAV and AIFF are supported."
         )
     
-    logger.info(f"Loading audio file: {path} (role: {role})")
+    logger.info("Loading audio file: %s (role: %s)", path, role)
     
-    # Load audio file using soundfile for format detection, then librosa for processing
+    # Decode in a single soundfile pass; WAV/AIFF need nothing librosa.load adds
     try:
-        # First, read metadata to get original sample rate
         with sf.SoundFile(str(path)) as f:
-            original_sr = f.samplerate
+            sr = f.samplerate
             channels = f.channels
-            frames = f.frames
-            duration = frames / original_sr
-        
-        # Load audio data
-        # librosa.load always returns mono, so we'll handle stereo separately if needed
-        samples, sr = librosa.load(str(path), sr=None, mono=False)
+            
+            if channels == 1:
+                # Mono audio: soundfile returns shape (frames,)
+                samples = f.read(dtype="float32")
+            else:
+                # Multi-channel audio: keep it as (channels, samples)
+                # Later analysis can convert to mono if needed
+                samples = _read_channels_first(f)
         
-        # If stereo, keep it; librosa.load with mono=False returns shape (channels, samples)
-        # If mono, samples is 1D array
-        if samples.ndim == 1:
-            # Mono audio
-            channels = 1
-        else:
-            # Multi-channel audio (samples.shape = (channels, samples))
-            channels = samples.shape[0]
-            # For now, we'll keep multi-channel as-is
-            # Later analysis can convert to mono if needed
+        duration = samples.shape[-1] / sr
         
         # Check if resampling is needed
         if sr not in target_sample_rates:
             target_sr = target_sample_rates[0]
-            logger.info(f"Resampling from {sr} Hz to {target_sr} Hz")
+            logger.info("Resampling from %d Hz to %d Hz", sr, target_sr)
             
+            # soxr resamples every channel in one call but wants (frames, channels) input
             if samples.ndim == 1:
-                # Mono: resample directly
-                samples = librosa.resample(samples, orig_sr=sr, target_sr=target_sr)
+                samples = soxr.resample(samples, sr, target_sr, quality="HQ")
             else:
-                # Multi-channel: resample each channel
-                resampled_channels = []
-                for ch in range(channels):
-                    resampled_ch = librosa.resample(
-                        samples[ch], orig_sr=sr, target_sr=target_sr
-                    )
-                    resampled_channels.append(resampled_ch)
-                samples = np.array(resampled_channels)
+                samples = np.ascontiguousarray(soxr.resample(samples.T, sr, target_sr, quality="HQ").T)
             
             sr = target_sr
             duration = samples.shape[-1] / sr
         
-        logger.info(
-            f"Loaded audio: {duration:.2f}s, {channels} channel(s), {sr} Hz, "
-            f"shape: {samples.shape}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Loaded audio: %.2fs, %d channel(s), %d Hz, shape: %s",
+                duration, channels, sr, samples.shape
+            )
         
         return AudioFile(
             path=path,
@@ -141,6 +191,6 @@ def load_audio_file(
         )
     
     except Exception as e:
-        logger.error(f"Error loading audio file {path}: {e}")
+        logger.error("Error loading audio file %s: %s", path, e)
         raise
 
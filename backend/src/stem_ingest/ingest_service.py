@@ -1,9 +1,12 @@
 """Service for loading and validating reference bundles."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 
 import librosa
 import numpy as np
+import soxr
 
 from .audio_file import load_audio_file, AudioFile
 from models.reference_bundle import ReferenceBundle
@@ -11,6 +14,15 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Lowest sample rate the mono mix is decimated to (by an integer factor) before tempo estimation
+TEMPO_MIN_SAMPLE_RATE = 22050
+
+# librosa's default onset STFT size and hop at the original sample rate. The window and hop are
+# divided by the decimation factor so the envelope keeps the same window length and frame rate in
+# seconds; the FFT stays TEMPO_N_FFT long (zero-padded) so the default mel bank has no empty filters
+TEMPO_N_FFT = 2048
+TEMPO_HOP_LENGTH = 512
+
 
 def snap_bpm_to_grid(raw_bpm: float) -> float:
     """
@@ -35,12 +47,13 @@ def snap_bpm_to_grid(raw_bpm: float) -> float:
     # Simple half-time / double-time correction
     if snapped < 70.0:
         snapped *= 2.0
-        logger.debug(f"BPM below 70, assuming half-time: {snapped:.2f}")
+        logger.debug("BPM below 70, assuming half-time: %.2f", snapped)
     elif snapped > 180.0:
         snapped *= 0.5
-        logger.debug(f"BPM above 180, assuming double-time: {snapped:.2f}")
+        logger.debug("BPM above 180, assuming double-time: %.2f", snapped)
     
-    logger.info(f"Snapped raw BPM {raw_bpm:.2f} -> {snapped:.2f}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Snapped raw BPM %.2f -> %.2f", raw_bpm, snapped)
     return snapped
 
 
@@ -49,43 +62,50 @@ def estimate_bpm(audio_file: AudioFile) -> float:
     Estimate BPM from the full_mix audio.
     
     - Convert to mono.
-    - Use librosa.beat.tempo with a median aggregate for robustness.
+    - Decimate to at least TEMPO_MIN_SAMPLE_RATE (tempo needs no high-frequency content).
+    - Use librosa's tempo estimator with a median aggregate for robustness.
     - Snap the resulting BPM to a sensible grid.
     
+    The result is cached on the AudioFile, so repeat calls return immediately.
+    
     Args:
         audio_file: AudioFile instance to analyze
     
     Returns:
         Snapped BPM as float
     """
-    logger.info(f"Estimating BPM from {audio_file.role} stem with librosa.beat.tempo")
-    
-    y = audio_file.samples
-    sr = audio_file.sr
+    if audio_file._bpm is not None:
+        return audio_file._bpm
     
-    # Ensure mono
-    if y.ndim == 2:
-        # (channels, samples) or (samples, channels); handle most common shape
-        if y.shape[0] < y.shape[1]:
-            y_mono = np.mean(y, axis=0)
-        else:
-            y_mono = np.mean(y, axis=1)
-    else:
-        y_mono = y
+    logger.info("Estimating BPM from %s stem with librosa tempo", audio_file.role)
     
-    # Use librosa.beat.tempo with median aggregate for robustness
-    tempo_array = librosa.beat.tempo(y=y_mono, sr=sr, aggregate=np.median)
+    y_mono = audio_file.mono
+    sr = audio_file.sr
     
-    if isinstance(tempo_array, (list, np.ndarray)):
-        raw_bpm = float(tempo_array[0])
-    else:
-        raw_bpm = float(tempo_array)
+    # Tempo needs no content above ~11 kHz. Decimating by an integer factor and scaling the
+    # STFT window and hop by the same factor keeps the envelope's timing identical to a
+    # full-rate run
+    factor = max(1, sr // TEMPO_MIN_SAMPLE_RATE)
+    win_length = TEMPO_N_FFT // factor
+    hop_length = TEMPO_HOP_LENGTH // factor
+    if factor > 1:
+        y_mono = soxr.resample(y_mono, sr, sr // factor, quality="HQ")
+        sr //= factor
+    
+    onset_env = librosa.onset.onset_strength(
+        y=y_mono, sr=sr, n_fft=TEMPO_N_FFT, win_length=win_length, hop_length=hop_length
+    )
+    tempo_array = librosa.feature.tempo(
+        onset_envelope=onset_env, sr=sr, hop_length=hop_length, aggregate=np.median
+    )
+    raw_bpm = float(tempo_array[0])
     
-    logger.info(f"Estimated raw BPM from librosa.beat.tempo: {raw_bpm:.2f}")
+    logger.info("Estimated raw BPM from librosa tempo: %.2f", raw_bpm)
     
     snapped_bpm = snap_bpm_to_grid(raw_bpm)
-    logger.info(f"Final BPM (snapped): {snapped_bpm:.2f}")
+    logger.info("Final BPM (snapped): %.2f", snapped_bpm)
     
+    audio_file._bpm = snapped_bpm
     return snapped_bpm
 
 
@@ -134,12 +154,14 @@ def load_reference_bundle(file_paths: Dict[str, Path]) -> ReferenceBundle:
     
     logger.info("Loading reference bundle...")
     
-    # Load all audio files
-    audio_files = {}
-    for role in required_keys:
-        path = file_paths[role]
-        logger.info(f"Loading {role}: {path}")
-        audio_files[role] = load_audio_file(path, role=role)
+    # Load all audio files concurrently: decoding and resampling release the GIL
+    # (load_audio_file logs each file itself)
+    with ThreadPoolExecutor(max_workers=len(required_keys)) as executor:
+        futures = {
+            role: executor.submit(load_audio_file, file_paths[role], role=role)
+            for role in required_keys
+        }
+        audio_files = {role: future.result() for role, future in futures.items()}
     
     # Estimate BPM from full mix
     logger.info("Estimating BPM from full mix...")
@@ -149,7 +171,7 @@ def load_reference_bundle(file_paths: Dict[str, Path]) -> ReferenceBundle:
     logger.info("Estimating key from full mix...")
     key = estimate_key(audio_files['full_mix'])
     if key:
-        logger.info(f"Estimated key: {key}")
+        logger.info("Estimated key: %s", key)
     else:
         logger.info("Key estimation not implemented yet")
     
@@ -169,6 +191,7 @@ def load_reference_bundle(file_paths: Dict[str, Path]) -> ReferenceBundle:
     bundle.validate_lengths()
     logger.info("All audio files have matching durations")
     
-    logger.info(f"Successfully loaded reference bundle: {bundle}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Successfully loaded reference bundle: %s", bundle)
     return bundle
 
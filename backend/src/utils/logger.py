@@ -18,8 +18,9 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
     
-    # Avoid adding multiple handlers if logger already configured
-    if logger.handlers:
+    # Avoid adding multiple handlers if logger already configured, and don't add one
+    # if the root logger has a handler: records propagate there and would print twice
+    if logger.handlers or logging.getLogger().handlers:
         return logger
     
     handler = logging.StreamHandler(sys.stdout)
@@ -0,0 +1,32 @@
+"""Tests for the analysis executor."""
+import os
+import sys
+
+import pytest
+
+# Add src to path to match how routes_reference imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api import analysis_pool
+
+
+@pytest.mark.asyncio
+async def test_run_analysis_uses_threads_when_pool_disabled(monkeypatch):
+    """With no workers configured, analysis runs in the API process."""
+    monkeypatch.setattr(analysis_pool, "ANALYSIS_WORKERS", 0)
+    
+    assert analysis_pool.get_analysis_pool() is None
+    assert await analysis_pool.run_analysis(os.getpid) == os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_run_analysis_uses_worker_process(monkeypatch):
+    """With workers configured, analysis runs in a separate process."""
+    monkeypatch.setattr(analysis_pool, "ANALYSIS_WORKERS", 1)
+    
+    try:
+        assert await analysis_pool.run_analysis(os.getpid) != os.getpid()
+        assert await analysis_pool.run_analysis(divmod, 7, 2) == (3, 1)
+    finally:
+        analysis_pool.shutdown_analysis_pool()
+    assert analysis_pool._POOL is None
@@ -27,8 +27,11 @@ def create_synthetic_audio_file(
     amplitude: float = 0.5
 ) -> AudioFile:
     """Create a synthetic audio file for testing."""
-    t = np.linspace(0, duration, int(sr * duration))
-    samples = amplitude * np.sin(2 * np.pi * frequency * t)
+    # Built in float32 in place: no float64 temporaries per stem
+    samples = np.linspace(0.0, duration, int(sr * duration), endpoint=False, dtype=np.float32)
+    samples *= np.float32(2 * np.pi * frequency)
+    np.sin(samples, out=samples)
+    samples *= np.float32(amplitude)
     
     return AudioFile(
         path=Path(f"{role}.wav"),
@@ -42,20 +45,22 @@ def create_synthetic_audio_file(
 
 def create_test_bundle(duration: float = 60.0, bpm: float = 120.0) -> ReferenceBundle:
     """Create a test reference bundle."""
-    drums = create_synthetic_audio_file(duration, 44100, "drums", 220, 0.5)
-    bass = create_synthetic_audio_file(duration, 44100, "bass", 110, 0.3)
-    vocals = create_synthetic_audio_file(duration, 44100, "vocals", 440, 0.3)
-    instruments = create_synthetic_audio_file(duration, 44100, "instruments", 660, 0.3)
+    # The annotation endpoints never read sample data, so all stems share one read-only buffer
     full_mix = create_synthetic_audio_file(duration, 44100, "full_mix", 440, 0.5)
+    full_mix.samples.flags.writeable = False
+    stems = {
+        role: AudioFile(
+            path=Path(f"{role}.wav"),
+            role=role,
+            sr=full_mix.sr,
+            duration=duration,
+            channels=1,
+            samples=full_mix.samples
+        )
+        for role in ("drums", "bass", "vocals", "instruments")
+    }
     
-    return ReferenceBundle(
-        drums=drums,
-        bass=bass,
-        vocals=vocals,
-        instruments=instruments,
-        full_mix=full_mix,
-        bpm=bpm
-    )
+    return ReferenceBundle(full_mix=full_mix, bpm=bpm, **stems)
 
 
 @pytest.fixture
@@ -343,3 +348,32 @@ def test_post_annotations_invalid_stem_category(client, setup_test_data):
     )
     assert response.status_code == 422  # Validation error
 
+
+
+def test_get_annotations_etag(client, setup_test_data, monkeypatch):
+    """Test GET annotations carries an ETag, honors If-None-Match and changes when annotations are replaced."""
+    from api import routes_reference
+    monkeypatch.setattr(routes_reference, "VISUAL_COMPOSER_ENABLED", True)
+    reference_id = setup_test_data
+    
+    REFERENCE_ANNOTATIONS[reference_id] = ReferenceAnnotations(
+        reference_id=reference_id,
+        regions=[RegionAnnotations(region_id="region_01", notes="first")]
+    )
+    response = client.get(f"/api/reference/{reference_id}/annotations")
+    assert response.status_code == 200
+    assert response.json()["regions"][0]["regionNotes"] == "first"
+    etag = response.headers["etag"]
+    
+    not_modified = client.get(f"/api/reference/{reference_id}/annotations", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    
+    REFERENCE_ANNOTATIONS[reference_id] = ReferenceAnnotations(
+        reference_id=reference_id,
+        regions=[RegionAnnotations(region_id="region_01", notes="second")]
+    )
+    changed = client.get(f"/api/reference/{reference_id}/annotations", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["regions"][0]["regionNotes"] == "second"
+    assert changed.headers["etag"] != etag
@@ -1,4 +1,5 @@
 """API tests for motifs, call-response, and fills endpoints."""
+import json
 import pytest
 import numpy as np
 from pathlib import Path
@@ -77,21 +78,8 @@ def test_reference_id():
     instances, groups = detect_motifs(bundle, regions, sensitivity=0.5)
     
     # Store raw instances
-    from analysis.motif_detector.motif_detector import MotifInstance
-    raw_instances = []
-    for inst in instances:
-        raw_inst = MotifInstance(
-            id=inst.id,
-            stem_role=inst.stem_role,
-            start_time=inst.start_time,
-            end_time=inst.end_time,
-            features=inst.features.copy(),
-            group_id=None,
-            is_variation=False,
-            region_ids=inst.region_ids.copy()
-        )
-        raw_instances.append(raw_inst)
-    REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = raw_instances
+    from analysis.motif_detector.motif_detector import RawMotifInstances
+    REFERENCE_MOTIF_INSTANCES_RAW[reference_id] = RawMotifInstances.from_instances(instances)
     
     REFERENCE_MOTIFS[reference_id] = (instances, groups)
     
@@ -125,7 +113,7 @@ async def test_get_motifs_endpoint(test_reference_id):
     assert test_reference_id in REFERENCE_MOTIF_INSTANCES_RAW, f"Reference {test_reference_id} not in raw instances"
     
     # Test without sensitivity parameter (pass None explicitly since we're calling directly)
-    result = await routes_reference.get_motifs(test_reference_id, sensitivity=None)
+    result = json.loads((await routes_reference.get_motifs(test_reference_id, sensitivity=None)).body)
     
     assert "referenceId" in result
     assert result["referenceId"] == test_reference_id
@@ -165,8 +153,8 @@ async def test_get_motifs_with_sensitivity(test_reference_id):
     from api import routes_reference
     
     # Test with different sensitivity
-    result_low = await routes_reference.get_motifs(test_reference_id, sensitivity=0.2)
-    result_high = await routes_reference.get_motifs(test_reference_id, sensitivity=0.8)
+    result_low = json.loads((await routes_reference.get_motifs(test_reference_id, sensitivity=0.2)).body)
+    result_high = json.loads((await routes_reference.get_motifs(test_reference_id, sensitivity=0.8)).body)
     
     # Both should return valid results
     assert "instances" in result_low
@@ -180,12 +168,70 @@ async def test_get_motifs_with_sensitivity(test_reference_id):
     assert isinstance(result_high["groupCount"], int)
 
 
+@pytest.mark.asyncio
+async def test_get_motifs_with_sensitivity_reuses_reclustered_payload(test_reference_id, monkeypatch):
+    """Test GET /reference/{id}/motifs re-clusters once per sensitivity until motifs change."""
+    from api import routes_reference
+    from analysis.motif_detector.motif_detector import RawMotifInstances
+    
+    cluster_calls = []
+    original_cluster_motifs = routes_reference._cluster_motifs
+    
+    def counting_cluster_motifs(*args, **kwargs):
+        cluster_calls.append(args[1])
+        return original_cluster_motifs(*args, **kwargs)
+    
+    monkeypatch.setattr(routes_reference, "_cluster_motifs", counting_cluster_motifs)
+    
+    first = await routes_reference.get_motifs(test_reference_id, sensitivity=0.3)
+    second = await routes_reference.get_motifs(test_reference_id, sensitivity=0.3)
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.6)
+    assert second.body == first.body
+    assert cluster_calls == [0.3, 0.6]
+    
+    # Re-detected motifs must invalidate the memoized clustering
+    raw_instances = REFERENCE_MOTIF_INSTANCES_RAW[test_reference_id]
+    REFERENCE_MOTIF_INSTANCES_RAW[test_reference_id] = RawMotifInstances(
+        raw_instances.scalars, raw_instances.features, raw_instances.region_ids
+    )
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.3)
+    assert cluster_calls == [0.3, 0.6, 0.3]
+
+
+@pytest.mark.asyncio
+async def test_reclustered_payloads_are_keyed_by_rounded_sensitivity_and_lru(test_reference_id, monkeypatch):
+    """Test re-clustered /motifs payloads share a rounded key and evict the least recently used one."""
+    from api import routes_reference
+    from models.store import REFERENCE_MOTIFS_RECLUSTERED_JSON
+    
+    cluster_calls = []
+    original_cluster_motifs = routes_reference._cluster_motifs
+    
+    def counting_cluster_motifs(*args, **kwargs):
+        cluster_calls.append(args[1])
+        return original_cluster_motifs(*args, **kwargs)
+    
+    monkeypatch.setattr(routes_reference, "_cluster_motifs", counting_cluster_motifs)
+    monkeypatch.setattr(routes_reference, "MAX_RECLUSTERED_PAYLOADS", 2)
+    REFERENCE_MOTIFS_RECLUSTERED_JSON.pop(test_reference_id, None)
+    
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.300001)
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.6)
+    # Within rounding of 0.3, so it is served from (and refreshes) the 0.3 entry
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.3)
+    await routes_reference.get_motifs(test_reference_id, sensitivity=0.7)
+    
+    # The clusterer gets the requested sensitivity; rounding only applies to the key
+    assert cluster_calls == [0.300001, 0.6, 0.7]
+    assert list(REFERENCE_MOTIFS_RECLUSTERED_JSON[test_reference_id]) == [(0.3,), (0.7,)]
+
+
 @pytest.mark.asyncio
 async def test_get_call_response_endpoint(test_reference_id):
     """Test GET /reference/{id}/call-response endpoint."""
     from api import routes_reference
     
-    result = await routes_reference.get_call_response(test_reference_id)
+    result = json.loads((await routes_reference.get_call_response(test_reference_id)).body)
     
     assert "referenceId" in result
     assert result["referenceId"] == test_reference_id
@@ -215,7 +261,7 @@ async def test_get_fills_endpoint(test_reference_id):
     """Test GET /reference/{id}/fills endpoint."""
     from api import routes_reference
     
-    result = await routes_reference.get_fills(test_reference_id)
+    result = json.loads((await routes_reference.get_fills(test_reference_id)).body)
     
     assert "referenceId" in result
     assert result["referenceId"] == test_reference_id
@@ -235,6 +281,88 @@ async def test_get_fills_endpoint(test_reference_id):
         assert isinstance(fill["stemRoles"], list)
 
 
+@pytest.mark.asyncio
+async def test_get_fills_serves_cached_payload_until_fills_change(test_reference_id):
+    """Test GET /reference/{id}/fills reuses the encoded payload until fills are replaced."""
+    from api import routes_reference
+    
+    first = await routes_reference.get_fills(test_reference_id)
+    second = await routes_reference.get_fills(test_reference_id)
+    assert second.body == first.body
+    
+    # Replacing the stored fills must invalidate the cached payload
+    REFERENCE_FILLS[test_reference_id] = []
+    result = json.loads((await routes_reference.get_fills(test_reference_id)).body)
+    assert result["fills"] == []
+    assert result["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_fills_etag_not_modified(test_reference_id):
+    """Test GET /reference/{id}/fills returns 304 when If-None-Match matches the ETag."""
+    from api import routes_reference
+    
+    first = await routes_reference.get_fills(test_reference_id)
+    etag = first.headers["etag"]
+    
+    not_modified = await routes_reference.get_fills(test_reference_id, if_none_match=etag)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+    
+    # A stale ETag gets the full payload
+    from analysis.fill_detector.fill_detector import Fill
+    REFERENCE_FILLS[test_reference_id] = [
+        Fill(id="fill_test", time=1.0, stem_roles=["drums"], region_id="region_01", confidence=0.9)
+    ]
+    changed = await routes_reference.get_fills(test_reference_id, if_none_match=etag)
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_fills_serves_cached_gzip_payload(test_reference_id):
+    """Test GET /reference/{id}/fills serves the pre-compressed payload to gzip clients."""
+    import gzip
+    from api import routes_reference
+    from analysis.fill_detector.fill_detector import Fill
+    
+    REFERENCE_FILLS[test_reference_id] = [
+        Fill(id=f"fill_{i}", time=float(i), stem_roles=["drums"], region_id="region_01", confidence=0.9)
+        for i in range(100)
+    ]
+    
+    plain = await routes_reference.get_fills(test_reference_id, accept_encoding="identity")
+    compressed = await routes_reference.get_fills(test_reference_id, accept_encoding="gzip, deflate")
+    
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert gzip.decompress(compressed.body) == plain.body
+    assert json.loads(plain.body)["count"] == 100
+
+
+@pytest.mark.asyncio
+async def test_get_call_response_by_stem_rebuilds_when_motifs_change(test_reference_id):
+    """Test GET /reference/{id}/call-response-by-stem caches lanes until any input is replaced."""
+    from api import routes_reference
+    from analysis.motif_detector.motif_detector import RawMotifInstances
+    from models.store import REFERENCE_CALL_RESPONSE_LANES_JSON
+    
+    first = await routes_reference.get_call_response_by_stem(test_reference_id)
+    cached = REFERENCE_CALL_RESPONSE_LANES_JSON[test_reference_id]
+    second = await routes_reference.get_call_response_by_stem(test_reference_id)
+    assert second.body == first.body
+    assert REFERENCE_CALL_RESPONSE_LANES_JSON[test_reference_id] is cached
+    assert json.loads(first.body)["reference_id"] == test_reference_id
+    
+    # Re-detected motif instances must invalidate the cached lanes
+    raw_instances = RawMotifInstances.from_instances([])
+    REFERENCE_MOTIF_INSTANCES_RAW[test_reference_id] = raw_instances
+    await routes_reference.get_call_response_by_stem(test_reference_id)
+    assert REFERENCE_CALL_RESPONSE_LANES_JSON[test_reference_id][0][-1] is raw_instances
+
 @pytest.mark.asyncio
 async def test_get_motifs_not_found():
     """Test GET /reference/{id}/motifs with non-existent reference."""
@@ -276,7 +404,7 @@ async def test_get_motif_sensitivity_endpoint(test_reference_id):
     """Test GET /reference/{id}/motif-sensitivity endpoint returns defaults."""
     from api import routes_reference
     
-    result = await routes_reference.get_motif_sensitivity(test_reference_id)
+    result = json.loads((await routes_reference.get_motif_sensitivity(test_reference_id)).body)
     
     assert "referenceId" in result
     assert result["referenceId"] == test_reference_id
@@ -302,7 +430,7 @@ async def test_patch_motif_sensitivity_updates_only_provided_keys(test_reference
     from api.routes_reference import MotifSensitivityUpdate
     
     # Get initial config
-    initial_result = await routes_reference.get_motif_sensitivity(test_reference_id)
+    initial_result = json.loads((await routes_reference.get_motif_sensitivity(test_reference_id)).body)
     initial_config = initial_result["motifSensitivityConfig"]
     
     # Update only drums
@@ -329,6 +457,44 @@ async def test_patch_motif_sensitivity_updates_only_provided_keys(test_reference
     assert bundle.motif_sensitivity_config["drums"] == 0.7
 
 
+@pytest.mark.asyncio
+async def test_get_motif_sensitivity_etag_changes_after_patch(test_reference_id):
+    """Test GET /reference/{id}/motif-sensitivity answers 304 until the config is patched."""
+    from api import routes_reference
+    from api.routes_reference import MotifSensitivityUpdate
+    
+    first = await routes_reference.get_motif_sensitivity(test_reference_id)
+    etag = first.headers["etag"]
+    not_modified = await routes_reference.get_motif_sensitivity(test_reference_id, if_none_match=etag)
+    assert not_modified.status_code == 304
+    
+    await routes_reference.update_motif_sensitivity(test_reference_id, MotifSensitivityUpdate(bass=0.8))
+    changed = await routes_reference.get_motif_sensitivity(test_reference_id, if_none_match=etag)
+    assert changed.status_code == 200
+    assert json.loads(changed.body)["motifSensitivityConfig"]["bass"] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_patch_motif_sensitivity_does_not_wait_for_analysis(test_reference_id):
+    """Test PATCH /reference/{id}/motif-sensitivity completes while an analysis holds the reference lock."""
+    import asyncio
+    from api import routes_reference
+    from api.routes_reference import MotifSensitivityUpdate
+    from models.store import get_reference_lock
+    
+    bundle = REFERENCE_BUNDLES[test_reference_id]
+    previous_config = bundle.motif_sensitivity_config
+    async with get_reference_lock(test_reference_id):
+        result = await asyncio.wait_for(
+            routes_reference.update_motif_sensitivity(test_reference_id, MotifSensitivityUpdate(vocals=0.6)),
+            timeout=1.0
+        )
+    assert result["motifSensitivityConfig"]["vocals"] == 0.6
+    # The config is replaced, not mutated, so an analysis that read it earlier is unaffected
+    assert bundle.motif_sensitivity_config is not previous_config
+    assert previous_config["vocals"] != 0.6
+
+
 @pytest.mark.asyncio
 async def test_patch_motif_sensitivity_validates_range():
     """Test PATCH /reference/{id}/motif-sensitivity validates values are in [0, 1]."""
@@ -349,6 +515,15 @@ async def test_patch_motif_sensitivity_validates_range():
     # Pydantic validation should catch this before our endpoint code
 
 
+def test_motif_sensitivity_update_rejects_unknown_stems():
+    """Test MotifSensitivityUpdate rejects keys that are not stem roles."""
+    from pydantic import ValidationError
+    from api.routes_reference import MotifSensitivityUpdate
+    
+    with pytest.raises(ValidationError):
+        MotifSensitivityUpdate.model_validate({"drum": 0.4})
+
+
 @pytest.mark.asyncio
 async def test_patch_motif_sensitivity_not_found():
     """Test PATCH /reference/{id}/motif-sensitivity with non-existent reference."""
@@ -364,6 +539,44 @@ async def test_patch_motif_sensitivity_not_found():
     assert exc_info.value.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_analyze_reference_endpoint(test_reference_id):
+    """Test POST /reference/{id}/analyze stores every stage's results."""
+    from api import routes_reference
+    
+    result = await routes_reference.analyze_reference(test_reference_id, motif_sensitivity=routes_reference.DEFAULT_MOTIF_SENSITIVITY)
+    
+    assert result["status"] == "ok"
+    assert result["regionCount"] == len(REFERENCE_REGIONS[test_reference_id])
+    instances, groups = REFERENCE_MOTIFS[test_reference_id]
+    assert result["motifInstanceCount"] == len(instances)
+    assert result["motifGroupCount"] == len(groups)
+    assert len(REFERENCE_MOTIF_INSTANCES_RAW[test_reference_id]) == len(instances)
+    assert result["callResponseCount"] == len(REFERENCE_CALL_RESPONSE[test_reference_id])
+    assert result["fillCount"] == len(REFERENCE_FILLS[test_reference_id])
+
+
+@pytest.mark.asyncio
+async def test_analyze_reference_leaves_stores_untouched_when_a_stage_fails(test_reference_id, monkeypatch):
+    """Test POST /reference/{id}/analyze publishes nothing (not even regions) if a later stage raises."""
+    from fastapi import HTTPException
+    from api import routes_reference
+    
+    def failing_detect_fills(*args, **kwargs):
+        raise RuntimeError("fill detection failed")
+    
+    monkeypatch.setattr(routes_reference, "detect_fills", failing_detect_fills)
+    previous_regions = REFERENCE_REGIONS[test_reference_id]
+    previous_motifs = REFERENCE_MOTIFS[test_reference_id]
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await routes_reference.analyze_reference(test_reference_id, motif_sensitivity=routes_reference.DEFAULT_MOTIF_SENSITIVITY)
+    
+    assert exc_info.value.status_code == 500
+    assert REFERENCE_REGIONS[test_reference_id] is previous_regions
+    assert REFERENCE_MOTIFS[test_reference_id] is previous_motifs
+
+
 @pytest.mark.asyncio
 async def test_reanalyze_motifs_endpoint(test_reference_id):
     """Test POST /reference/{id}/reanalyze-motifs endpoint."""
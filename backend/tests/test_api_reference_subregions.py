@@ -1,4 +1,5 @@
 """API tests for subregions endpoint."""
+import json
 import pytest
 import numpy as np
 from pathlib import Path
@@ -12,7 +13,7 @@ from models.reference_bundle import ReferenceBundle
 from stem_ingest.audio_file import AudioFile
 from models.store import (
     REFERENCE_BUNDLES, REFERENCE_REGIONS, REFERENCE_MOTIFS,
-    REFERENCE_SUBREGIONS
+    REFERENCE_SUBREGIONS, REFERENCE_SUBREGIONS_JSON, REFERENCE_DENSITY_CURVES
 )
 from analysis.region_detector.region_detector import detect_regions
 from analysis.motif_detector.motif_detector import detect_motifs
@@ -99,7 +100,7 @@ async def test_get_subregions_endpoint_structure(setup_test_data):
     from api import routes_reference
     
     # Call the endpoint function directly
-    response = await routes_reference.get_subregions(reference_id)
+    response = json.loads((await routes_reference.get_subregions(reference_id)).body)
     
     # Check response structure
     assert "referenceId" in response
@@ -190,10 +191,28 @@ async def test_get_subregions_endpoint_caching(setup_test_data):
     # Second call should use cache
     response2 = await routes_reference.get_subregions(reference_id)
     
-    # Responses should be identical
-    assert response1 == response2
+    # Responses should be identical, and served from the same encoded payload
+    assert response1.body == response2.body
+    assert reference_id in REFERENCE_SUBREGIONS_JSON
     
     # Cache should be populated
     assert reference_id in REFERENCE_SUBREGIONS
     assert len(REFERENCE_SUBREGIONS[reference_id]) == len(regions)
 
+
+
+@pytest.mark.asyncio
+async def test_get_subregions_reuses_density_curves(setup_test_data):
+    """Density curves are computed once per bundle and reused when subregions are recomputed."""
+    reference_id, bundle, regions = setup_test_data
+    
+    from api import routes_reference
+    
+    await routes_reference.get_subregions(reference_id)
+    density_curves = REFERENCE_DENSITY_CURVES[reference_id]
+    assert density_curves.bundle is bundle
+    
+    # Dropping the subregions (as re-analysis does) recomputes them from the same curves
+    REFERENCE_SUBREGIONS.pop(reference_id)
+    await routes_reference.get_subregions(reference_id)
+    assert REFERENCE_DENSITY_CURVES[reference_id] is density_curves
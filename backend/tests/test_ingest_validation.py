@@ -4,7 +4,8 @@ import pytest
 from pathlib import Path
 
 from src.models.reference_bundle import ReferenceBundle
-from src.stem_ingest.audio_file import AudioFile
+from src.stem_ingest.audio_file import AudioFile, load_audio_file
+from src.stem_ingest.ingest_service import estimate_bpm, load_reference_bundle
 
 
 def test_validate_lengths_success():
@@ -136,3 +137,206 @@ def test_validate_lengths_failure():
     with pytest.raises(ValueError, match="Audio file durations differ"):
         bundle.validate_lengths(tolerance=0.05)
 
+
+
+def test_reference_bundle_has_no_instance_dict():
+    """ReferenceBundle stores its fields in slots."""
+    audio = AudioFile(
+        path=Path("drums.wav"), role="drums", sr=22050, duration=1.0, channels=1, samples=np.zeros(22050)
+    )
+    bundle = ReferenceBundle(
+        drums=audio, bass=audio, vocals=audio, instruments=audio, full_mix=audio, bpm=120.0
+    )
+    
+    assert not hasattr(bundle, "__dict__")
+    assert bundle.copy().motif_sensitivity_config == bundle.motif_sensitivity_config
+
+
+def test_load_audio_file_keeps_channels_first(tmp_path):
+    """Test that a stereo WAV loads as a (channels, samples) float32 array."""
+    import soundfile as sf
+    
+    sr = 44100
+    # Longer than one READ_BLOCK_FRAMES block
+    stereo = np.random.uniform(-0.5, 0.5, size=(2 * sr, 2)).astype(np.float32)
+    path = tmp_path / "drums.wav"
+    sf.write(str(path), stereo, sr, subtype="FLOAT")
+    
+    audio = load_audio_file(path, "drums")
+    
+    assert audio.channels == 2
+    assert audio.sr == sr
+    assert audio.samples.shape == (2, 2 * sr)
+    assert audio.samples.dtype == np.float32
+    assert audio.samples.flags["C_CONTIGUOUS"]
+    assert audio.duration == pytest.approx(2.0)
+    np.testing.assert_allclose(audio.samples, stereo.T)
+
+
+def test_load_audio_file_resamples_all_channels(tmp_path):
+    """Test that an unsupported sample rate is resampled for every channel."""
+    import soundfile as sf
+    
+    sr = 22050
+    t = np.arange(sr) / sr
+    stereo = np.stack([np.sin(2 * np.pi * 220 * t), np.sin(2 * np.pi * 440 * t)], axis=1)
+    path = tmp_path / "bass.wav"
+    sf.write(str(path), stereo.astype(np.float32), sr, subtype="FLOAT")
+    
+    audio = load_audio_file(path, "bass")
+    
+    assert audio.sr == 44100
+    assert audio.channels == 2
+    assert audio.samples.shape == (2, 44100)
+    assert audio.samples.flags["C_CONTIGUOUS"]
+    assert audio.duration == pytest.approx(1.0)
+    # Each channel keeps its own content
+    assert not np.allclose(audio.samples[0], audio.samples[1])
+
+
+def test_audio_file_mono_is_cached_float32():
+    """Test that the mono mixdown is float32 and computed only once."""
+    stereo = np.stack([np.ones(1000), -np.ones(1000) * 0.5])
+    audio = AudioFile(
+        path=Path("full_mix.wav"), role="full_mix", sr=1000, duration=1.0, channels=2, samples=stereo
+    )
+    
+    mono = audio.mono
+    
+    assert mono.dtype == np.float32
+    assert mono.shape == (1000,)
+    np.testing.assert_allclose(mono, 0.25)
+    assert audio.mono is mono
+    
+    mono_only = AudioFile(
+        path=Path("bass.wav"), role="bass", sr=1000, duration=1.0, channels=1, samples=np.ones(1000)
+    )
+    assert mono_only.mono is mono_only.samples
+
+
+def test_load_reference_bundle_assigns_each_stem_its_file(tmp_path):
+    """Test that concurrently loaded stems end up in the right bundle slots."""
+    import soundfile as sf
+    
+    sr = 44100
+    roles = ["drums", "bass", "vocals", "instruments", "full_mix"]
+    file_paths = {}
+    for i, role in enumerate(roles):
+        path = tmp_path / f"{role}.wav"
+        # A distinct constant level per stem identifies it after loading
+        sf.write(str(path), np.full(sr * 2, 0.1 * (i + 1), dtype=np.float32), sr, subtype="FLOAT")
+        file_paths[role] = path
+    
+    bundle = load_reference_bundle(file_paths)
+    
+    for i, role in enumerate(roles):
+        audio = getattr(bundle, role)
+        assert audio.role == role
+        assert audio.path == file_paths[role]
+        np.testing.assert_allclose(audio.samples[:100], 0.1 * (i + 1), rtol=1e-3)
+
+
+def _drum_loop(bpm: float, sr: int = 44100, duration: float = 20.0) -> np.ndarray:
+    """Kick on 1 and 3, snare on 2 and 4, hats on every 8th note."""
+    rng = np.random.default_rng(0)
+    n = 4000
+    t = np.arange(n) / sr
+    kick = np.sin(2 * np.pi * 60 * t) * np.exp(-t * 30)
+    snare = rng.standard_normal(n) * np.exp(-t * 40) * 0.6
+    hat = np.diff(rng.standard_normal(n + 1) * np.exp(-np.arange(n + 1) / sr * 200) * 0.3)
+    samples = np.zeros(int(duration * sr) + n, dtype=np.float32)
+    for i, eighth_time in enumerate(np.arange(0.0, duration, 30.0 / bpm)):
+        start = int(eighth_time * sr)
+        samples[start:start + n] += hat
+        if i % 4 == 0:
+            samples[start:start + n] += kick
+        elif i % 4 == 2:
+            samples[start:start + n] += snare
+    return samples[:int(duration * sr)]
+
+
+@pytest.mark.parametrize("bpm", [85.0, 100.0, 115.0, 130.0, 145.0, 160.0, 175.0])
+def test_estimate_bpm_matches_full_rate_librosa_tempo(bpm):
+    """Test that decimating before the onset envelope keeps the full-rate librosa tempo result."""
+    import librosa
+    from src.stem_ingest.ingest_service import snap_bpm_to_grid
+    
+    sr = 44100
+    samples = _drum_loop(bpm, sr)
+    audio = AudioFile(
+        path=Path("full_mix.wav"), role="full_mix", sr=sr, duration=len(samples) / sr, channels=1, samples=samples
+    )
+    
+    full_rate = librosa.feature.tempo(y=samples, sr=sr, aggregate=np.median)[0]
+    
+    assert estimate_bpm(audio) == snap_bpm_to_grid(float(full_rate))
+
+
+@pytest.mark.parametrize("bpm", [100.0, 120.0, 140.0, 160.0])
+def test_estimate_bpm_matches_full_rate_librosa_tempo_at_96k(bpm):
+    """Test that a 96 kHz file decimated by 4 keeps the full-rate result without empty mel filters."""
+    import warnings
+    import librosa
+    from src.stem_ingest.ingest_service import snap_bpm_to_grid
+    
+    sr = 96000
+    samples = _drum_loop(bpm, sr)
+    audio = AudioFile(
+        path=Path("full_mix.wav"), role="full_mix", sr=sr, duration=len(samples) / sr, channels=1, samples=samples
+    )
+    
+    full_rate = librosa.feature.tempo(y=samples, sr=sr, aggregate=np.median)[0]
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert estimate_bpm(audio) == snap_bpm_to_grid(float(full_rate))
+
+
+def test_estimate_bpm_is_cached_on_audio_file(monkeypatch):
+    """Test that a second estimate_bpm call reuses the first result."""
+    import src.stem_ingest.ingest_service as ingest_service
+    
+    sr = 22050
+    samples = np.zeros(sr * 4, dtype=np.float32)
+    samples[::sr // 2] = 1.0
+    audio = AudioFile(
+        path=Path("full_mix.wav"), role="full_mix", sr=sr, duration=4.0, channels=1, samples=samples
+    )
+    
+    first = estimate_bpm(audio)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("onset envelope recomputed")
+    
+    monkeypatch.setattr(ingest_service.librosa.onset, "onset_strength", fail)
+    assert estimate_bpm(audio) == first
+
+
+def test_audio_file_has_no_instance_dict():
+    """Test that AudioFile uses slots like the other analysis dataclasses."""
+    audio = AudioFile(
+        path=Path("drums.wav"), role="drums", sr=22050, duration=1.0, channels=1, samples=np.zeros(22050)
+    )
+    
+    assert not hasattr(audio, "__dict__")
+    with pytest.raises(AttributeError):
+        audio.tempo = 120.0
+
+
+def test_load_audio_file_rejects_empty_file(tmp_path):
+    """Test that a decoded file with no samples fails validation."""
+    import soundfile as sf
+    
+    path = tmp_path / "vocals.wav"
+    sf.write(str(path), np.zeros(0, dtype=np.float32), 44100)
+    
+    with pytest.raises(ValueError, match="no samples"):
+        load_audio_file(path, "vocals")
+
+
+def test_audio_file_rejects_samples_not_matching_channels():
+    """Test that direct construction still rejects empty or mismatched sample arrays."""
+    with pytest.raises(ValueError, match="no samples"):
+        AudioFile(path=Path("drums.wav"), role="drums", sr=44100, duration=1.0, channels=1, samples=np.zeros(0))
+    with pytest.raises(ValueError, match="channel"):
+        AudioFile(path=Path("drums.wav"), role="drums", sr=44100, duration=1.0, channels=1, samples=np.zeros((2, 100)))
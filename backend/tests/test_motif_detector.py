@@ -10,6 +10,7 @@ from src.stem_ingest.audio_file import AudioFile
 from src.analysis.motif_detector.motif_detector import (
     MotifInstance,
     MotifGroup,
+    RawMotifInstances,
     detect_motifs,
     bars_to_seconds,
     _segment_stem,
@@ -414,6 +415,49 @@ def test_motif_group_properties():
     assert len(group.variations) == 1, "Group should have 1 variation"
 
 
+def test_raw_motif_instances_round_trip():
+    """Test RawMotifInstances snapshots instances without clustering state."""
+    instances = [
+        MotifInstance(
+            id="inst_1",
+            stem_role="drums",
+            start_time=0.0,
+            end_time=4.0,
+            features=np.array([1.0, 2.0, 3.0]),
+            group_id="group_1",
+            is_variation=False,
+            region_ids=["region_01"]
+        ),
+        MotifInstance(
+            id="inst_22",
+            stem_role="instruments",
+            start_time=4.0,
+            end_time=8.5,
+            features=np.array([1.1, 2.1, 3.1]),
+            group_id="group_1",
+            is_variation=True
+        )
+    ]
+    
+    raw = RawMotifInstances.from_instances(instances)
+    instances[0].features[0] = 99.0  # Snapshot must not share feature storage
+    
+    assert len(raw) == 2
+    restored = raw.to_instances()
+    assert [inst.id for inst in restored] == ["inst_1", "inst_22"]
+    assert [inst.stem_role for inst in restored] == ["drums", "instruments"]
+    assert restored[1].end_time == 8.5
+    assert restored[0].region_ids == ["region_01"]
+    shared = RawMotifInstances.from_instances([instances[0], instances[0]]).region_ids
+    assert shared[0] == ("region_01",) and shared[1] is shared[0]  # Identical alignments are interned
+    assert all(inst.group_id is None and not inst.is_variation for inst in restored)
+    np.testing.assert_array_equal(restored[0].features, [1.0, 2.0, 3.0])
+    assert not restored[0].features.flags.writeable  # Rows are shared views, not copies
+    assert np.shares_memory(restored[0].features, raw.features)
+    assert raw.to_instances(include_region_ids=False)[0].region_ids == []
+    assert RawMotifInstances.from_instances([]).to_instances() == []
+
+
 def test_per_stem_sensitivity_config():
     """Test that per-stem sensitivity config works correctly."""
     bundle = create_synthetic_bundle_with_repeats(duration=30.0, bpm=120.0)
@@ -806,3 +850,38 @@ def test_detect_motifs_exclude_full_mix():
     assert len(instances_stem_only) >= 0, "Stem-only analysis should produce valid results"
     assert len(instances_with_full_mix) >= 0, "Analysis with full_mix should produce valid results"
 
+
+def test_detect_motifs_skips_silent_stems(monkeypatch):
+    """Test that stems peaking below the segment energy threshold are never segmented."""
+    from src.analysis.motif_detector import motif_detector
+    
+    bundle = create_synthetic_bundle_with_repeats(duration=30.0, bpm=120.0)
+    bundle.vocals = create_synthetic_audio_file(30.0, 44100, "vocals", 440, 0.005)
+    
+    regions = [
+        Region(
+            id="region_01",
+            name="Section 1",
+            type="low_energy",
+            start=0.0,
+            end=30.0,
+            motifs=[],
+            fills=[],
+            callResponse=[]
+        )
+    ]
+    
+    segmented_lengths = []
+    original_segment_stem = motif_detector._segment_stem
+    
+    def tracking_segment_stem(audio, *args, **kwargs):
+        segmented_lengths.append(len(audio))
+        return original_segment_stem(audio, *args, **kwargs)
+    
+    monkeypatch.setattr(motif_detector, "_segment_stem", tracking_segment_stem)
+    
+    instances, _ = detect_motifs(bundle, regions, sensitivity=0.5, exclude_full_mix=True)
+    
+    assert len(segmented_lengths) == 3, "Silent vocals stem should not be segmented"
+    assert "vocals" not in {inst.stem_role for inst in instances}
+    assert {"drums", "bass", "instruments"} <= {inst.stem_role for inst in instances}
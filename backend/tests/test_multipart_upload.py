@@ -0,0 +1,151 @@
+"""Tests for streaming multipart upload handling."""
+import pytest
+import sys
+import os
+import time
+
+# Add src to path to match how routes_reference imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from starlette.requests import Request
+
+from api import multipart_upload
+from api.multipart_upload import stream_multipart_files
+
+
+def make_multipart_request(parts, boundary: bytes = b"testboundary", chunk_size: int = 7) -> Request:
+    """Build a multipart/form-data request whose body arrives in small chunks."""
+    body = b""
+    for name, filename, data in parts:
+        body += (
+            b"--" + boundary + b"\r\n"
+            b'Content-Disposition: form-data; name="' + name + b'"; filename="' + filename + b'"\r\n'
+            b"Content-Type: application/octet-stream\r\n\r\n" + data + b"\r\n"
+        )
+    body += b"--" + boundary + b"--\r\n"
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] + [b""]
+    
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+    
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + boundary)],
+    }
+    return Request(scope, receive)
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_writes_expected_fields(tmp_path):
+    """Expected file fields are written to disk with their upload suffix; others are ignored."""
+    request = make_multipart_request([
+        (b"drums", b"drums.wav", b"d" * 1000),
+        (b"bass", b"bass.flac", b"b" * 1000),
+        (b"extra", b"extra.wav", b"x" * 10),
+    ])
+    
+    file_paths = await stream_multipart_files(request, tmp_path, ["drums", "bass"])
+    
+    assert file_paths == {"drums": tmp_path / "drums.wav", "bass": tmp_path / "bass.flac"}
+    assert file_paths["drums"].read_bytes() == b"d" * 1000
+    assert file_paths["bass"].read_bytes() == b"b" * 1000
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bass.flac", "drums.wav"]
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_flushes_large_parts(tmp_path, monkeypatch):
+    """Parts larger than the write buffer are written across several flushes."""
+    monkeypatch.setattr(multipart_upload, "WRITE_CHUNK_SIZE", 64)
+    data = bytes(range(256)) * 8
+    request = make_multipart_request([(b"drums", b"drums.wav", data)], chunk_size=50)
+    
+    file_paths = await stream_multipart_files(request, tmp_path, ["drums"])
+    
+    assert file_paths["drums"].read_bytes() == data
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_missing_field(tmp_path):
+    """A missing expected field raises ValueError."""
+    request = make_multipart_request([(b"drums", b"drums.wav", b"d")])
+    
+    with pytest.raises(ValueError, match="bass"):
+        await stream_multipart_files(request, tmp_path, ["drums", "bass"])
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_rejects_duplicate_field(tmp_path):
+    """A repeated file field is rejected as soon as its headers arrive instead of being appended."""
+    request = make_multipart_request([
+        (b"full_mix", b"mix.wav", b"a" * 1000),
+        (b"full_mix", b"mix.wav", b"b" * 1000),
+    ])
+    
+    with pytest.raises(ValueError, match="Duplicate upload file: full_mix"):
+        await stream_multipart_files(request, tmp_path, ["full_mix"])
+    
+    assert (tmp_path / "full_mix.wav").read_bytes() == b"a" * 1000
+
+
+def test_upload_reference_rejects_duplicate_field_with_400(tmp_path, monkeypatch):
+    """POST /reference/upload answers 400 when a stem field is sent twice."""
+    from fastapi.testclient import TestClient
+    from main import app
+    from api import routes_reference
+    
+    monkeypatch.setattr(routes_reference, "TEMP_DIR", tmp_path)
+    wav = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 100
+    files = [(role, (f"{role}.wav", wav)) for role in routes_reference.UPLOAD_ROLES]
+    files.append(("full_mix", ("full_mix.wav", wav)))
+    
+    response = TestClient(app).post("/api/reference/upload", files=files)
+    
+    assert response.status_code == 400
+    assert "Duplicate upload file: full_mix" in response.json()["detail"]
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_rejects_disallowed_suffix(tmp_path):
+    """A file with a suffix outside allowed_suffixes is rejected before anything is written."""
+    request = make_multipart_request([(b"drums", b"drums.mp3", b"d" * 1000)])
+    
+    with pytest.raises(multipart_upload.UnsupportedUploadError, match=".mp3"):
+        await stream_multipart_files(request, tmp_path, ["drums"], allowed_suffixes=[".wav", ".aif"])
+    
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_multipart_files_checks_file_headers(tmp_path):
+    """Files are accepted or rejected from their leading bytes."""
+    from stem_ingest.audio_file import AUDIO_HEADER_SIZE, is_supported_audio_header
+    
+    wav = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 100
+    options = dict(header_check=is_supported_audio_header, header_size=AUDIO_HEADER_SIZE)
+    
+    ok = make_multipart_request([(b"drums", b"drums.WAV", wav)], chunk_size=5)
+    file_paths = await stream_multipart_files(ok, tmp_path, ["drums"], allowed_suffixes=[".wav"], **options)
+    assert file_paths["drums"].read_bytes() == wav
+    
+    bad = make_multipart_request([(b"bass", b"bass.wav", b"ID3" + b"\x00" * 100)], chunk_size=5)
+    with pytest.raises(multipart_upload.UnsupportedUploadError, match="bass"):
+        await stream_multipart_files(bad, tmp_path, ["bass"], **options)
+    assert not (tmp_path / "bass.wav").exists() or (tmp_path / "bass.wav").stat().st_size == 0
+
+
+def test_remove_stale_upload_dirs(tmp_path):
+    """Only upload directories older than the cutoff are removed."""
+    old_dir = tmp_path / "old"
+    new_dir = tmp_path / "new"
+    for d in (old_dir, new_dir):
+        d.mkdir()
+        (d / "drums.wav").write_bytes(b"d")
+    stale = time.time() - 120
+    os.utime(old_dir, (stale, stale))
+    
+    assert multipart_upload.remove_stale_upload_dirs(tmp_path, 60) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["new"]
+    assert multipart_upload.remove_stale_upload_dirs(tmp_path / "missing", 60) == 0
@@ -0,0 +1,122 @@
+"""Tests for the in-memory reference store."""
+import sys
+import os
+
+# Add src to path to match how routes_reference imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+
+from models.store import (
+    REFERENCE_BUNDLES, REFERENCE_REGIONS, REFERENCE_FILLS, REFERENCE_FILLS_JSON,
+    REFERENCE_ANNOTATIONS, REFERENCE_LOCKS, evict_reference, get_reference_lock
+)
+
+
+def test_reference_bundles_evicts_least_recently_used(monkeypatch):
+    """Storing past the limit evicts the least recently used reference and its analysis results."""
+    REFERENCE_BUNDLES.clear()
+    monkeypatch.setattr(REFERENCE_BUNDLES, "max_references", 2)
+    
+    REFERENCE_BUNDLES["ref_a"] = object()
+    REFERENCE_BUNDLES["ref_b"] = object()
+    REFERENCE_REGIONS["ref_a"] = []
+    REFERENCE_REGIONS["ref_b"] = []
+    REFERENCE_FILLS["ref_b"] = []
+    REFERENCE_FILLS_JSON["ref_b"] = ([], b"{}", "etag", None)
+    
+    # Reading ref_a makes ref_b the least recently used
+    REFERENCE_BUNDLES["ref_a"]
+    REFERENCE_BUNDLES["ref_c"] = object()
+    
+    try:
+        assert list(REFERENCE_BUNDLES) == ["ref_a", "ref_c"]
+        assert "ref_b" not in REFERENCE_REGIONS
+        assert "ref_b" not in REFERENCE_FILLS
+        assert "ref_b" not in REFERENCE_FILLS_JSON
+        assert "ref_a" in REFERENCE_REGIONS
+    finally:
+        REFERENCE_BUNDLES.clear()
+        REFERENCE_REGIONS.clear()
+        REFERENCE_FILLS.clear()
+        REFERENCE_FILLS_JSON.clear()
+
+
+def test_reference_bundles_expires_idle_references(monkeypatch):
+    """References unused for longer than the TTL are evicted with their analysis results."""
+    from models import store
+    
+    now = [1000.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: now[0])
+    REFERENCE_BUNDLES.clear()
+    monkeypatch.setattr(REFERENCE_BUNDLES, "ttl_seconds", 60.0)
+    
+    REFERENCE_BUNDLES["ref_a"] = object()
+    REFERENCE_BUNDLES["ref_b"] = object()
+    REFERENCE_REGIONS["ref_a"] = []
+    
+    # Reading ref_b keeps it alive past ref_a's deadline
+    now[0] += 45.0
+    REFERENCE_BUNDLES["ref_b"]
+    now[0] += 30.0
+    
+    try:
+        assert REFERENCE_BUNDLES.get("ref_a") is None
+        assert "ref_a" not in REFERENCE_REGIONS
+        assert "ref_b" in REFERENCE_BUNDLES
+    finally:
+        REFERENCE_BUNDLES.clear()
+        REFERENCE_REGIONS.clear()
+
+
+def test_get_region_ids_follows_replaced_regions():
+    """Region ids are cached per regions list and rebuilt when the list is replaced."""
+    from types import SimpleNamespace
+    from models.store import get_region_ids
+    
+    try:
+        assert get_region_ids("ref_ids") == frozenset()
+        
+        REFERENCE_REGIONS["ref_ids"] = [SimpleNamespace(id="region_01"), SimpleNamespace(id="region_02")]
+        ids = get_region_ids("ref_ids")
+        assert ids == {"region_01", "region_02"}
+        assert get_region_ids("ref_ids") is ids
+        
+        REFERENCE_REGIONS["ref_ids"] = [SimpleNamespace(id="region_03")]
+        assert get_region_ids("ref_ids") == {"region_03"}
+    finally:
+        REFERENCE_REGIONS.clear()
+
+
+def test_reference_bundles_keeps_references_under_analysis(monkeypatch):
+    """A reference whose analysis lock is held is skipped; an evicted reference loses its annotations and idle lock."""
+    REFERENCE_BUNDLES.clear()
+    monkeypatch.setattr(REFERENCE_BUNDLES, "max_references", 2)
+    
+    async def run():
+        REFERENCE_BUNDLES["ref_a"] = object()
+        REFERENCE_BUNDLES["ref_b"] = object()
+        REFERENCE_ANNOTATIONS["ref_b"] = object()
+        lock_a = get_reference_lock("ref_a")
+        lock_b = get_reference_lock("ref_b")
+        
+        async with lock_a:
+            # ref_a is least recently used but busy, so ref_b goes instead
+            REFERENCE_BUNDLES["ref_c"] = object()
+            assert list(REFERENCE_BUNDLES) == ["ref_a", "ref_c"]
+            
+            # A held lock is never dropped, even when the reference's results are
+            evict_reference("ref_a")
+            assert get_reference_lock("ref_a") is lock_a
+        
+        assert "ref_b" not in REFERENCE_ANNOTATIONS
+        assert "ref_b" not in REFERENCE_LOCKS
+        assert get_reference_lock("ref_b") is not lock_b
+    
+    try:
+        asyncio.run(run())
+    finally:
+        REFERENCE_BUNDLES.clear()
+        REFERENCE_ANNOTATIONS.clear()
+        REFERENCE_LOCKS.pop("ref_a", None)
+        REFERENCE_LOCKS.pop("ref_b", None)
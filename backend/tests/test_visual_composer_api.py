@@ -15,7 +15,7 @@ from models.visual_composer_repository import (
     save_annotations,
     delete_annotations
 )
-from models.store import REFERENCE_BUNDLES, REFERENCE_REGIONS
+from models.store import REFERENCE_BUNDLES, REFERENCE_REGIONS, VISUAL_COMPOSER_ANNOTATIONS_JSON, evict_reference
 from models.reference_bundle import ReferenceBundle
 from models.region import Region
 from stem_ingest.audio_file import AudioFile
@@ -29,8 +29,11 @@ def create_synthetic_audio_file(
     amplitude: float = 0.5
 ) -> AudioFile:
     """Create a synthetic audio file for testing."""
-    t = np.linspace(0, duration, int(sr * duration))
-    samples = amplitude * np.sin(2 * np.pi * frequency * t)
+    # Built in float32 in place: no float64 temporaries per stem
+    samples = np.linspace(0.0, duration, int(sr * duration), endpoint=False, dtype=np.float32)
+    samples *= np.float32(2 * np.pi * frequency)
+    np.sin(samples, out=samples)
+    samples *= np.float32(amplitude)
     
     return AudioFile(
         path=Path(f"{role}.wav"),
@@ -44,20 +47,22 @@ def create_synthetic_audio_file(
 
 def create_test_bundle(duration: float = 60.0, bpm: float = 120.0) -> ReferenceBundle:
     """Create a test reference bundle."""
-    drums = create_synthetic_audio_file(duration, 44100, "drums", 220, 0.5)
-    bass = create_synthetic_audio_file(duration, 44100, "bass", 110, 0.3)
-    vocals = create_synthetic_audio_file(duration, 44100, "vocals", 440, 0.3)
-    instruments = create_synthetic_audio_file(duration, 44100, "instruments", 660, 0.3)
+    # The annotation endpoints never read sample data, so all stems share one read-only buffer
     full_mix = create_synthetic_audio_file(duration, 44100, "full_mix", 440, 0.5)
+    full_mix.samples.flags.writeable = False
+    stems = {
+        role: AudioFile(
+            path=Path(f"{role}.wav"),
+            role=role,
+            sr=full_mix.sr,
+            duration=duration,
+            channels=1,
+            samples=full_mix.samples
+        )
+        for role in ("drums", "bass", "vocals", "instruments")
+    }
     
-    return ReferenceBundle(
-        drums=drums,
-        bass=bass,
-        vocals=vocals,
-        instruments=instruments,
-        full_mix=full_mix,
-        bpm=bpm
-    )
+    return ReferenceBundle(full_mix=full_mix, bpm=bpm, **stems)
 
 
 @pytest.fixture
@@ -413,3 +418,148 @@ def test_get_annotations_with_regions_but_no_annotations_returns_defaults(client
         if project_id in REFERENCE_REGIONS:
             del REFERENCE_REGIONS[project_id]
 
+
+
+def test_validate_annotations_logs_overlapping_blocks(caplog):
+    """Test validate_annotations warns once per overlapping pair of blocks in a lane."""
+    import logging
+    from api.routes_visual_composer import validate_annotations
+    from models.visual_composer import VisualComposerAnnotations
+    
+    annotations = VisualComposerAnnotations.model_validate({
+        "projectId": "overlap_project",
+        "regions": [{
+            "regionId": "region_01",
+            "blocks": [
+                {"id": "b3", "laneId": "lane_1", "startBar": 6.0, "endBar": 8.0},
+                {"id": "b1", "laneId": "lane_1", "startBar": 0.0, "endBar": 3.0},
+                {"id": "b2", "laneId": "lane_1", "startBar": 2.0, "endBar": 4.0},
+                {"id": "b4", "laneId": "lane_2", "startBar": 1.0, "endBar": 9.0},
+            ]
+        }]
+    })
+    
+    with caplog.at_level(logging.WARNING):
+        validate_annotations(annotations, "overlap_project")
+    
+    overlap_messages = [r.getMessage() for r in caplog.records if "Overlapping blocks" in r.getMessage()]
+    assert len(overlap_messages) == 1
+    assert "block b1" in overlap_messages[0] and "block b2" in overlap_messages[0]
+
+
+def test_get_annotations_reuses_payload_until_inputs_change(client):
+    """Test GET annotations re-serves its payload until the saved annotations or regions are replaced."""
+    project_id = "test_project_cached_payload"
+    
+    def make_region(region_id, start):
+        return Region(
+            id=region_id, name=region_id, type="low_energy", start=start, end=start + 8.0,
+            motifs=[], fills=[], callResponse=[]
+        )
+    
+    REFERENCE_REGIONS[project_id] = [make_region("region_01", 0.0)]
+    try:
+        first = client.get(f"/api/visual-composer/{project_id}/annotations")
+        cached_payload = VISUAL_COMPOSER_ANNOTATIONS_JSON[project_id][1]
+        second = client.get(f"/api/visual-composer/{project_id}/annotations")
+        assert second.content == first.content == cached_payload
+        assert VISUAL_COMPOSER_ANNOTATIONS_JSON[project_id][1] is cached_payload
+        
+        # New regions rebuild the payload
+        REFERENCE_REGIONS[project_id] = [make_region("region_01", 0.0), make_region("region_02", 8.0)]
+        assert len(client.get(f"/api/visual-composer/{project_id}/annotations").json()["regions"]) == 2
+        
+        # Saving annotations rebuilds it too
+        post = client.post(f"/api/visual-composer/{project_id}/annotations", json={
+            "projectId": project_id,
+            "regions": [{"regionId": "region_01", "notes": "saved", "displayOrder": 0}]
+        })
+        assert post.status_code == 200
+        data = client.get(f"/api/visual-composer/{project_id}/annotations").json()
+        assert [r["regionId"] for r in data["regions"]] == ["region_01", "region_02"]
+        assert data["regions"][0]["notes"] == "saved"
+    finally:
+        REFERENCE_REGIONS.pop(project_id, None)
+        VISUAL_COMPOSER_ANNOTATIONS_JSON.pop(project_id, None)
+        if get_annotations(project_id):
+            delete_annotations(project_id)
+
+
+def test_get_annotations_etag(client):
+    """Test GET annotations carries an ETag and answers a matching If-None-Match with 304."""
+    project_id = "test_project_etag"
+    REFERENCE_REGIONS[project_id] = [
+        Region(id="region_01", name="Intro", type="low_energy", start=0.0, end=8.0, motifs=[], fills=[], callResponse=[])
+    ]
+    try:
+        response = client.get(f"/api/visual-composer/{project_id}/annotations")
+        etag = response.headers["etag"]
+        
+        not_modified = client.get(f"/api/visual-composer/{project_id}/annotations", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        
+        client.post(f"/api/visual-composer/{project_id}/annotations", json={
+            "projectId": project_id,
+            "regions": [{"regionId": "region_01", "notes": "saved"}]
+        })
+        changed = client.get(f"/api/visual-composer/{project_id}/annotations", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    finally:
+        REFERENCE_REGIONS.pop(project_id, None)
+        if get_annotations(project_id):
+            delete_annotations(project_id)
+
+
+def test_get_annotations_gzip_has_its_own_etag(client):
+    """Test a gzip-encoded GET annotations response carries a distinct ETag that still revalidates."""
+    project_id = "test_project_gzip_etag"
+    REFERENCE_REGIONS[project_id] = [
+        Region(id=f"region_{i:02d}", name=f"Region {i}", type="low_energy", start=i * 8.0, end=(i + 1) * 8.0,
+               motifs=[], fills=[], callResponse=[])
+        for i in range(20)
+    ]
+    try:
+        identity = client.get(f"/api/visual-composer/{project_id}/annotations", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        
+        encoded = client.get(f"/api/visual-composer/{project_id}/annotations", headers={"Accept-Encoding": "gzip"})
+        assert encoded.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in encoded.headers["vary"]
+        assert encoded.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+        assert encoded.content == identity.content
+        
+        not_modified = client.get(
+            f"/api/visual-composer/{project_id}/annotations",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": encoded.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
+    finally:
+        REFERENCE_REGIONS.pop(project_id, None)
+        VISUAL_COMPOSER_ANNOTATIONS_JSON.pop(project_id, None)
+
+
+def test_annotations_payload_cache_is_evicted_and_bounded(client, monkeypatch):
+    """Test cached GET annotations payloads go with their reference and never exceed the bound."""
+    from api import routes_visual_composer
+    monkeypatch.setattr(routes_visual_composer, "MAX_VISUAL_COMPOSER_PAYLOADS", 2)
+    project_ids = [f"test_project_bounded_{i}" for i in range(3)]
+    for project_id in project_ids:
+        REFERENCE_REGIONS[project_id] = [
+            Region(id="region_01", name="Intro", type="low_energy", start=0.0, end=8.0,
+                   motifs=[], fills=[], callResponse=[])
+        ]
+    try:
+        for project_id in project_ids:
+            assert client.get(f"/api/visual-composer/{project_id}/annotations").status_code == 200
+        # The least recently used project was dropped
+        assert project_ids[0] not in VISUAL_COMPOSER_ANNOTATIONS_JSON
+        assert project_ids[2] in VISUAL_COMPOSER_ANNOTATIONS_JSON
+        
+        evict_reference(project_ids[2])
+        assert project_ids[2] not in VISUAL_COMPOSER_ANNOTATIONS_JSON
+    finally:
+        for project_id in project_ids:
+            REFERENCE_REGIONS.pop(project_id, None)
+            VISUAL_COMPOSER_ANNOTATIONS_JSON.pop(project_id, None)
@@ -0,0 +1,90 @@
+"""Tests for the Visual Composer annotations repository."""
+import sqlite3
+import sys
+import os
+
+import pytest
+
+# Add src to path to match how routes_visual_composer imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models import visual_composer_repository as repo
+from models.visual_composer import VisualComposerAnnotations
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path, monkeypatch):
+    """Point the repository at a fresh SQLite database."""
+    db_path = str(tmp_path / "annotations.db")
+    monkeypatch.setattr(repo, "VISUAL_COMPOSER_DB_PATH", db_path)
+    monkeypatch.setattr(repo, "_CONNECTION", None)
+    monkeypatch.setattr(repo, "_CACHE", repo.OrderedDict())
+    yield db_path
+    if repo._CONNECTION is not None:
+        repo._CONNECTION.close()
+
+
+def make_annotations(project_id: str, notes: str) -> VisualComposerAnnotations:
+    return VisualComposerAnnotations(projectId=project_id, regions=[{"regionId": "region_01", "notes": notes}])
+
+
+def test_sqlite_repository_persists_across_restarts(sqlite_repo, monkeypatch):
+    """Annotations saved to the database survive a fresh connection and cache."""
+    repo.save_annotations(make_annotations("project_a", "first"))
+    assert repo.get_annotations("project_a").regions[0].notes == "first"
+    
+    repo._CONNECTION.close()
+    monkeypatch.setattr(repo, "_CONNECTION", None)
+    monkeypatch.setattr(repo, "_CACHE", repo.OrderedDict())
+    
+    assert repo.has_annotations("project_a")
+    assert repo.get_annotations("project_a").regions[0].notes == "first"
+    assert repo.delete_annotations("project_a")
+    assert repo.get_annotations("project_a") is None
+    assert not repo.delete_annotations("project_a")
+
+
+def test_sqlite_repository_revalidates_cache_against_other_writers(sqlite_repo):
+    """The front cache is reused until another connection saves a newer version."""
+    annotations = make_annotations("project_b", "mine")
+    repo.save_annotations(annotations)
+    assert repo.get_annotations("project_b") is annotations
+    
+    # Another worker updates the stored annotations
+    other = sqlite3.connect(sqlite_repo, isolation_level=None)
+    other.execute(
+        "UPDATE visual_composer_annotations SET payload = ?, version = version + 1 WHERE project_id = ?",
+        (make_annotations("project_b", "theirs").model_dump_json(by_alias=True), "project_b")
+    )
+    other.close()
+    
+    reloaded = repo.get_annotations("project_b")
+    assert reloaded is not annotations
+    assert reloaded.regions[0].notes == "theirs"
+    assert repo.get_annotations("project_b") is reloaded
+
+
+def test_sqlite_repository_bounds_front_cache(sqlite_repo, monkeypatch):
+    """Only the most recently used annotations stay in the front cache."""
+    monkeypatch.setattr(repo, "VISUAL_COMPOSER_CACHE_SIZE", 2)
+    for project_id in ("p1", "p2", "p3"):
+        repo.save_annotations(make_annotations(project_id, project_id))
+    
+    assert list(repo._CACHE) == ["p2", "p3"]
+    assert repo.get_annotations("p1").regions[0].notes == "p1"
+    assert list(repo._CACHE) == ["p3", "p1"]
+
+
+def test_annotations_share_repeated_lane_and_color_strings():
+    """Lane ids and colors parsed from JSON are interned across lanes and blocks."""
+    annotations = VisualComposerAnnotations.model_validate_json(
+        '{"projectId": "p", "regions": [{"regionId": "r1",'
+        ' "lanes": [{"id": "lane_1", "name": "Drums", "order": 0}],'
+        ' "blocks": [{"id": "b1", "laneId": "lane_1", "startBar": 0, "endBar": 1, "color": "#ff0000"},'
+        ' {"id": "b2", "laneId": "lane_1", "startBar": 1, "endBar": 2, "color": "#ff0000"}]}]}'
+    )
+    lane = annotations.regions[0].lanes[0]
+    first, second = annotations.regions[0].blocks
+    
+    assert first.laneId is second.laneId is lane.id
+    assert first.color is second.color